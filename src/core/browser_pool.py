@@ -0,0 +1,406 @@
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+try:
+    from playwright.async_api import async_playwright
+except Exception:  # noqa: BLE001
+    async_playwright = None
+    logger.debug("Playwright is not installed; the browser pool is unavailable.")
+
+def is_playwright_available() -> bool:
+    return async_playwright is not None
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """
+    How pages are loaded: which requests are aborted and when a page counts
+    as rendered.
+    """
+
+    name: str
+    blocked_resource_types: FrozenSet[str] = frozenset()
+    blocked_hosts: Tuple[str, ...] = ()
+    wait_until: str = "networkidle"
+    # After wait_until, wait until no request has been in flight for quiet_ms,
+    # but never longer than max_quiet_wait_ms.
+    quiet_ms: int = 0
+    max_quiet_wait_ms: int = 0
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        if not self.blocked_hosts:
+            return False
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == blocked or host.endswith("." + blocked) for blocked in self.blocked_hosts)
+
+# Ad, analytics and tracking hosts never carry contact data.
+TRACKER_HOSTS: Tuple[str, ...] = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "analytics.tiktok.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "mouseflow.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "fullstory.com",
+    "newrelic.com",
+    "nr-data.net",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "matomo.cloud",
+    "cookiebot.com",
+    "usercentrics.eu",
+    "onetrust.com",
+)
+
+FULL_PROFILE = RenderProfile(name="full")
+
+LEAN_PROFILE = RenderProfile(
+    name="lean",
+    blocked_resource_types=frozenset(
+        {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "websocket", "manifest"}
+    ),
+    blocked_hosts=TRACKER_HOSTS,
+    wait_until="domcontentloaded",
+    quiet_ms=500,
+    max_quiet_wait_ms=3000,
+)
+
+RENDER_PROFILES: Dict[str, RenderProfile] = {
+    FULL_PROFILE.name: FULL_PROFILE,
+    LEAN_PROFILE.name: LEAN_PROFILE,
+}
+
+def get_render_profile(name: Optional[str]) -> RenderProfile:
+    if not name:
+        return LEAN_PROFILE
+    try:
+        return RENDER_PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown render profile: {name}") from None
+
+@dataclass
+class _ContextSlot:
+    context: Any
+    generation: int
+    uses: int = 0
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every renderer.
+
+    - One browser is launched lazily and reused; `size` browser contexts are
+      handed out so that many pages render concurrently.
+    - A context is recycled after max_uses_per_context pages or when a page
+      left more than max_js_heap_mb of JS heap behind; the browser itself is
+      relaunched after browser_recycle_after pages.
+    - The pool owns an event loop on a background thread, so synchronous
+      callers (render) and coroutines on any loop (render_async) share it.
+    - The RenderProfile decides which requests are aborted and how long to
+      wait; the default lean profile skips images, fonts, media and trackers
+      and waits for DOM-ready plus a short quiet period.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        user_agent: Optional[str] = None,
+        max_uses_per_context: int = 50,
+        max_js_heap_mb: int = 256,
+        browser_recycle_after: int = 1000,
+        headless: bool = True,
+        proxy: Optional[str] = None,
+        profile: RenderProfile = LEAN_PROFILE,
+    ) -> None:
+        if async_playwright is None:
+            raise RuntimeError(
+                "BrowserPool requires the 'playwright' package. "
+                "Install it with `pip install playwright && playwright install chromium`.",
+            )
+        self.size = max(1, size)
+        self.user_agent = user_agent
+        self.max_uses_per_context = max(1, max_uses_per_context)
+        self.max_js_heap_mb = max_js_heap_mb
+        self.browser_recycle_after = max(1, browser_recycle_after)
+        self.headless = headless
+        self.proxy = proxy
+        self.profile = profile
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # Only touched from the pool's own loop.
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._generation = 0
+        self._renders_on_browser = 0
+        self._active = 0
+        self._slots: Optional[asyncio.Queue] = None
+        self._state: Optional[asyncio.Condition] = None
+
+    # ------- Loop management -------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="browser-pool",
+                    daemon=True,
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def _submit(self, coro: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # ------- Public API -------
+
+    def render(
+        self, url: str, timeout: float = 15, allowed: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """
+        Render url and return its HTML, or None on failure. Blocks the caller.
+        A page redirected to a URL that allowed (e.g. robots.txt) rejects is
+        dropped too.
+        """
+        return self._submit(self._render(url, timeout, allowed)).result()
+
+    def render_many(
+        self,
+        urls: Sequence[str],
+        timeout: float = 15,
+        allowed: Optional[Callable[[str], bool]] = None,
+    ) -> List[Optional[str]]:
+        """Render several URLs concurrently; results are in input order."""
+        return self._submit(self._render_many(urls, timeout, allowed)).result()
+
+    async def render_async(self, url: str, timeout: float = 15) -> Optional[str]:
+        """Awaitable render usable from any event loop."""
+        return await asyncio.wrap_future(self._submit(self._render(url, timeout)))
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            self._submit(self._shutdown()).result(timeout=30)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Browser pool shutdown failed: %s", exc)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+
+    # ------- Pool internals (run on the pool loop) -------
+
+    async def _launch(self) -> None:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._generation += 1
+        self._renders_on_browser = 0
+        self._slots = asyncio.Queue()
+        for _ in range(self.size):
+            self._slots.put_nowait(None)  # contexts are created on first use
+        logger.info("Launched pooled Chromium (generation %d).", self._generation)
+
+    async def _new_slot(self) -> _ContextSlot:
+        context = await self._browser.new_context(
+            user_agent=self.user_agent,
+            proxy={"server": self.proxy} if self.proxy else None,
+        )
+        if self.profile.blocked_resource_types or self.profile.blocked_hosts:
+            await context.route("**/*", self._route)
+        return _ContextSlot(context=context, generation=self._generation)
+
+    async def _route(self, route: Any) -> None:
+        request = route.request
+        try:
+            if self.profile.blocks(request.resource_type, request.url):
+                await route.abort()
+            else:
+                await route.continue_()
+        except Exception:  # noqa: BLE001
+            pass  # page already closed
+
+    async def _goto(self, page: Any, url: str, timeout: float) -> None:
+        profile = self.profile
+        if not profile.quiet_ms:
+            await page.goto(url, wait_until=profile.wait_until, timeout=timeout * 1000)
+            return
+
+        in_flight = 0
+        last_activity = time.monotonic()
+
+        def on_start(_: Any) -> None:
+            nonlocal in_flight, last_activity
+            in_flight += 1
+            last_activity = time.monotonic()
+
+        def on_done(_: Any) -> None:
+            nonlocal in_flight, last_activity
+            in_flight = max(0, in_flight - 1)
+            last_activity = time.monotonic()
+
+        page.on("request", on_start)
+        page.on("requestfinished", on_done)
+        page.on("requestfailed", on_done)
+
+        await page.goto(url, wait_until=profile.wait_until, timeout=timeout * 1000)
+
+        # Short quiet period so XHR-filled contact blocks can land
+        deadline = time.monotonic() + profile.max_quiet_wait_ms / 1000
+        quiet = profile.quiet_ms / 1000
+        while time.monotonic() < deadline:
+            if not in_flight and time.monotonic() - last_activity >= quiet:
+                break
+            await asyncio.sleep(0.05)
+
+    async def _acquire(self) -> _ContextSlot:
+        if self._state is None:
+            self._state = asyncio.Condition()
+        async with self._state:
+            # Relaunch the browser once every in-flight page has finished.
+            while self._browser is not None and self._renders_on_browser >= self.browser_recycle_after:
+                if self._active == 0:
+                    await self._close_browser()
+                    break
+                await self._state.wait()
+            if self._browser is None:
+                await self._launch()
+            self._active += 1
+            self._renders_on_browser += 1
+
+        assert self._slots is not None
+        slot = await self._slots.get()
+        try:
+            if slot is None or slot.generation != self._generation:
+                slot = await self._new_slot()
+        except Exception:
+            self._slots.put_nowait(None)
+            async with self._state:
+                self._active -= 1
+                self._state.notify_all()
+            raise
+        return slot
+
+    async def _release(self, slot: _ContextSlot, recycle: bool) -> None:
+        slot.uses += 1
+        if recycle or slot.uses >= self.max_uses_per_context:
+            await self._close_quietly(slot.context)
+            slot = None  # type: ignore[assignment]
+        if self._slots is not None and (slot is None or slot.generation == self._generation):
+            self._slots.put_nowait(slot)
+        assert self._state is not None
+        async with self._state:
+            self._active -= 1
+            self._state.notify_all()
+
+    async def _js_heap_mb(self, page: Any) -> float:
+        try:
+            used = await page.evaluate(
+                "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+            )
+            return float(used) / (1024 * 1024)
+        except Exception:  # noqa: BLE001
+            return 0.0
+
+    async def _render(
+        self, url: str, timeout: float, allowed: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        try:
+            slot = await self._acquire()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Browser pool could not open a context for %s: %s", url, exc)
+            return None
+        recycle = False
+        page = None
+        try:
+            page = await slot.context.new_page()
+            await self._goto(page, url, timeout)
+            # The browser follows redirects itself; check where it ended up
+            if allowed is not None and page.url != url and not allowed(page.url):
+                logger.debug("Dropping %s: redirected to %s, disallowed by robots.txt", url, page.url)
+                return None
+            content = await page.content()
+            if self.max_js_heap_mb and await self._js_heap_mb(page) > self.max_js_heap_mb:
+                logger.debug("Recycling browser context after heavy page %s", url)
+                recycle = True
+            return content
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Pooled render failed for %s: %s", url, exc, exc_info=True)
+            recycle = True
+            return None
+        finally:
+            if page is not None:
+                await self._close_quietly(page)
+            await self._release(slot, recycle)
+
+    async def _render_many(
+        self, urls: Sequence[str], timeout: float, allowed: Optional[Callable[[str], bool]] = None
+    ) -> List[Optional[str]]:
+        return list(await asyncio.gather(*(self._render(url, timeout, allowed) for url in urls)))
+
+    async def _close_quietly(self, closable: Any) -> None:
+        try:
+            await closable.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    async def _close_browser(self) -> None:
+        if self._slots is not None:
+            while not self._slots.empty():
+                slot = self._slots.get_nowait()
+                if slot is not None:
+                    await self._close_quietly(slot.context)
+        if self._browser is not None:
+            await self._close_quietly(self._browser)
+        self._browser = None
+
+    async def _shutdown(self) -> None:
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:  # noqa: BLE001
+                pass
+            self._playwright = None
+
+_shared_pool: Optional[BrowserPool] = None
+_shared_lock = threading.Lock()
+
+def get_browser_pool(**kwargs: Any) -> BrowserPool:
+    """
+    Return the process-wide BrowserPool, creating it on first use.
+    Keyword arguments only apply to that first call.
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool(**kwargs)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -1,15 +1,24 @@
 thonimport logging
 import time
-from collections import deque
-from typing import Any, Deque, Dict, List, Set, Tuple
-from urllib.parse import urljoin, urlparse
+from contextlib import nullcontext
+from html import unescape
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
 
-from extractors.email_parser import extract_emails
-from extractors.phone_detector import extract_phone_numbers
-from extractors.social_media_finder import find_social_media_links
+# Extractor modules import each other as top-level modules (the extractors
+# directory is on sys.path, see main.py), so they are imported the same way
+from contact_scanner import (  # type: ignore
+    EMAIL_KINDS,
+    SOCIAL,
+    TEL,
+    emails_from_hits,
+    get_scanner,
+    social_platform,
+)
+from phone_parser import extract_phone_numbers, validate_phone_candidates  # type: ignore
+from utils_cleaner import html_to_text  # type: ignore
 from extractors.utils_validation import (
     ensure_url_has_scheme,
     is_valid_url,
@@ -18,17 +27,27 @@ from extractors.utils_validation import (
     safe_int,
 )
 from core.playwright_handler import fetch_page_content
+from utils.fetch_guard import CHUNK_SIZE, MAX_REDIRECTS, FetchGuard, UnwantedContent, decode_body
+from utils.http_cache import HttpCache
+from utils.js_shell import looks_like_js_shell
+from utils.page_document import PageDocument
+from utils.proxy_pool import BAN_STATUSES, NoProxyAvailable, ProxyLease, ProxyPool
+from utils.retry_policy import RetryPolicy
+from utils.saturation import SaturationPolicy, SaturationTracker
+from utils.site_discovery import SiteDiscovery
+from utils.transport import get_http_session
+from utils.url_canonicalizer import canonicalize_url, same_site, url_key
+from utils.frontier import BestFirstFrontier
+from utils.url_fingerprint import make_visited_set, visited_set_size_hint
 
 logger = logging.getLogger(__name__)
 
 class Crawler:
     """
-    Simple breadth-first crawler that stays within a single domain per seed URL,
-    prioritizing likely contact pages.
+    Best-first crawler that stays within a single domain per seed URL,
+    fetching the links most likely to hold contact details first.
     """
 
-    PRIORITY_KEYWORDS = ("contact", "kontakt", "about", "impressum", "team")
-
     def __init__(self, settings: Dict[str, Any]) -> None:
         self.settings = settings
         self.max_depth = safe_int(settings.get("max_depth"), 2)
@@ -36,7 +55,22 @@ class Crawler:
         self.request_timeout = safe_int(settings.get("request_timeout"), 10)
         self.user_agent = settings.get("user_agent", "DeepContactScraper/1.0")
         self.use_playwright_fallback = bool(settings.get("use_playwright_fallback", True))
+        # Also render successfully fetched pages that look like JS app shells
+        self.adaptive_rendering = bool(settings.get("adaptive_rendering", False))
+        self.render_profile = settings.get("render_profile", "lean")
+        self.cache = HttpCache.from_config(settings)
+        self.visited_set = settings.get("visited_set", "fingerprint")
+        self.saturation = SaturationPolicy.from_config(settings)
+        self.discovery = SiteDiscovery.from_config(settings)
+        # Keep-alive pools shared with every other crawler in the process
+        self.session = get_http_session(pool_size=safe_int(settings.get("concurrent_requests"), 5))
+        # Transient failures are retried before falling back to Playwright
+        self.retry = RetryPolicy.from_config(settings, timeout=self.request_timeout)
+        self.proxy_pool = ProxyPool.from_config(settings)
         self.allowed_content_types = settings.get("allowed_content_types") or ["text/html"]
+        self.fetch_guard = FetchGuard.from_config(
+            {**settings, "allowed_content_types": self.allowed_content_types}
+        )
 
     # ------- Public API -------
 
@@ -74,63 +108,154 @@ class Crawler:
     # ------- Internal helpers -------
 
     def _crawl_site(self, start_url: str) -> List[Dict[str, Any]]:
-        parsed_start = urlparse(start_url)
-        start_domain = parsed_start.netloc
-
-        queue: Deque[Tuple[str, int]] = deque()
-        visited: Set[str] = set()
-
-        queue.append((start_url, 0))
-        visited.add(start_url)
+        frontier = BestFirstFrontier(start_url)
+        visited = make_visited_set(self.visited_set, visited_set_size_hint(self.max_pages_per_site))
+
+        frontier.push(start_url, 0)
+        visited.add(url_key(start_url))
+        site = self.discovery.discover(start_url, self._fetch_discovery) if self.discovery else None
+        if site is not None:
+            # Sitemap pages that look like contact pages skip the link hops
+            for seed, score in site.seeds:
+                if visited.add(url_key(seed)):
+                    frontier.push(seed, 1, score=score)
 
         results: List[Dict[str, Any]] = []
         pages_crawled = 0
+        tracker = SaturationTracker(self.saturation) if self.saturation else None
 
-        while queue and pages_crawled < self.max_pages_per_site:
-            url, depth = queue.popleft()
+        while frontier and pages_crawled < self.max_pages_per_site:
+            url, depth = frontier.pop()
+            if site is not None and not site.allowed(url):
+                logger.debug("Skipping %s (disallowed by robots.txt)", url)
+                continue
             logger.debug("Fetching %s (depth=%d)", url, depth)
 
-            html = self._fetch_page(url)
+            html = self._fetch_page(url, site.allowed if site is not None else None)
             if html is None:
                 continue
 
             pages_crawled += 1
-            page_results = self._extract_from_page(start_url, url, html)
+            document = PageDocument(html, url)
+            page_results = self._extract_from_page(start_url, url, document)
             results.extend(page_results)
+            if tracker is not None and tracker.observe_html(html):
+                logger.info("Stopping %s early: %s", start_url, tracker.describe())
+                break
 
             if depth >= self.max_depth:
                 continue
 
-            for next_url in self._extract_links(url, html):
-                if next_url in visited:
-                    continue
-                parsed_next = urlparse(next_url)
-                if parsed_next.netloc != start_domain:
+            for next_url, text in self._extract_links(url, document):
+                if not same_site(start_url, next_url):
                     continue  # stay within same domain
-                visited.add(next_url)
-                # Prioritize likely contact/about pages by pushing them to the left of the deque
-                lower_path = parsed_next.path.lower()
-                if any(keyword in lower_path for keyword in self.PRIORITY_KEYWORDS):
-                    queue.appendleft((next_url, depth + 1))
-                else:
-                    queue.append((next_url, depth + 1))
+                if visited.add(url_key(next_url)):
+                    frontier.push(next_url, depth + 1, text)
 
         logger.info("Crawled %d pages for %s", pages_crawled, start_url)
         return results
 
-    def _fetch_page(self, url: str) -> str | None:
-        headers = {"User-Agent": self.user_agent}
+    def _proxy_lease(self) -> ContextManager[Optional[ProxyLease]]:
+        if self.proxy_pool is None:
+            return nullcontext()
         try:
-            resp = requests.get(url, headers=headers, timeout=self.request_timeout)
-        except requests.RequestException as exc:
-            logger.warning("Request to %s failed: %s", url, exc)
-            return self._playwright_fallback(url) if self.use_playwright_fallback else None
-
-        content_type = resp.headers.get("Content-Type", "")
-        if not any(ct in content_type for ct in self.allowed_content_types):
-            logger.debug("Skipping %s due to unsupported content-type: %s", url, content_type)
+            return self.proxy_pool.acquire()
+        except NoProxyAvailable as exc:
+            raise requests.ConnectionError(str(exc)) from exc
+
+    def _fetch_page(self, url: str, allowed: Optional[Callable[[str], bool]] = None) -> str | None:
+        """
+        Text of url, or None when it is skipped or failed. Redirects are
+        followed here, not by requests, so every target passes the fetch
+        guard and allowed (the site's robots.txt) before it is requested.
+        """
+        try:
+            self.fetch_guard.check_url(url)
+        except UnwantedContent as exc:
+            logger.debug("Skipping %s", exc)
             return None
 
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            logger.debug("Serving %s from HTTP cache", url)
+            return cached.text
+
+        headers = {"User-Agent": self.user_agent}
+        headers.update(HttpCache.conditional_headers(cached))
+        target = url
+        redirects = 0
+        attempt = 0
+        banned_by: Set[str] = set()
+        while True:
+            timeout = self.retry.begin(target, attempt)
+            started = time.monotonic()
+            delay = None
+            try:
+                # Streamed: status and Content-Type are checked before the body is read
+                with self._proxy_lease() as lease, self.session.get(
+                    target,
+                    headers=headers,
+                    timeout=timeout,
+                    allow_redirects=False,
+                    proxies=lease.proxies if lease else None,
+                    stream=True,
+                ) as resp:
+                    if lease:
+                        lease.observe(resp.status_code)
+                    self.retry.record(target, time.monotonic() - started)
+                    if resp.is_redirect:
+                        redirects += 1
+                        if redirects > MAX_REDIRECTS:
+                            logger.warning("Giving up on %s after %d redirects", url, MAX_REDIRECTS)
+                            return None
+                        try:
+                            target = self.fetch_guard.check_redirect(
+                                target, resp.headers["Location"], allowed
+                            )
+                        except UnwantedContent as exc:
+                            logger.debug("Skipping %s", exc)
+                            return None
+                        # Validators belong to url, not to the redirect target
+                        headers = {"User-Agent": self.user_agent}
+                        attempt = 0
+                        continue
+                    if resp.status_code == 304 and cached is not None:
+                        logger.debug("%s not modified, reusing cached body", url)
+                        self.cache.revalidated(url, resp.headers)
+                        return cached.text
+
+                    status: Optional[int] = resp.status_code
+                    if lease and status in BAN_STATUSES:
+                        banned_by.add(lease.proxy)
+                        if not self.proxy_pool.page_banned(banned_by):
+                            status = None  # maybe the exit IP; retry through another proxy
+                    delay = self.retry.retry_delay(attempt, status, resp.headers)
+                    if delay is None:
+                        content_type = resp.headers.get("Content-Type", "")
+                        if not any(ct in content_type for ct in self.allowed_content_types):
+                            logger.debug(
+                                "Skipping %s due to unsupported content-type: %s", url, content_type
+                            )
+                            return None
+
+                        body = b""
+                        if resp.status_code < 400:
+                            body = self.fetch_guard.read(url, resp.iter_content(CHUNK_SIZE))
+            except requests.RequestException as exc:
+                if isinstance(exc, requests.Timeout):
+                    self.retry.record(target, timeout)
+                if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+                    delay = self.retry.retry_delay(attempt)
+                if delay is None:
+                    logger.warning("Request to %s failed: %s", url, exc)
+                    return self._playwright_fallback(url) if self.use_playwright_fallback else None
+
+            if delay is None:
+                break
+            attempt += 1
+            logger.debug("Retrying %s in %.1fs (retry %d)", target, delay, attempt)
+            time.sleep(delay)
+
         if resp.status_code >= 400:
             logger.warning("Got HTTP %s for %s", resp.status_code, url)
             if self.use_playwright_fallback:
@@ -138,14 +263,37 @@ class Crawler:
             return None
 
         logger.debug("Fetched %s via requests with status %s", url, resp.status_code)
-        return resp.text
+        if self.cache is not None:
+            self.cache.store(url, resp.status_code, resp.headers, body)
+        text = decode_body(body, resp.encoding)
+        if self.adaptive_rendering and looks_like_js_shell(text):
+            logger.debug("%s looks like a JavaScript shell, rendering it", url)
+            return self._playwright_fallback(url) or text
+        return text
+
+    def _fetch_discovery(self, url: str) -> bytes | None:
+        with self._proxy_lease() as lease:
+            resp = self.session.get(
+                url,
+                headers={"User-Agent": self.user_agent},
+                timeout=self.request_timeout,
+                proxies=lease.proxies if lease else None,
+            )
+            if lease:
+                lease.observe(resp.status_code)
+        return resp.content if resp.status_code == 200 else None
 
     def _playwright_fallback(self, url: str) -> str | None:
         if not self.use_playwright_fallback:
             return None
         try:
             start = time.time()
-            html = fetch_page_content(url, timeout=self.request_timeout, user_agent=self.user_agent)
+            html = fetch_page_content(
+                url,
+                timeout=self.request_timeout,
+                user_agent=self.user_agent,
+                profile=self.render_profile,
+            )
             elapsed = time.time() - start
             if html:
                 logger.info("Fetched %s via Playwright in %.2fs", url, elapsed)
@@ -154,13 +302,25 @@ class Crawler:
             logger.warning("Playwright fallback failed for %s: %s", url, exc)
             return None
 
-    def _extract_from_page(self, site_url: str, page_url: str, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(" ", strip=True)
-
-        email_set = extract_emails([html, text])
-        phone_set = extract_phone_numbers([html, text])
-        social_map = find_social_media_links([html, text])
+    def _extract_from_page(
+        self, site_url: str, page_url: str, html: str | PageDocument
+    ) -> List[Dict[str, Any]]:
+        document = PageDocument.of(html, page_url)
+        # One scan of the markup finds emails, tel:/mailto: links and social
+        # URLs; as in page_contacts, phones are read from the visible text,
+        # where scripts and attributes cannot fake them, and validated
+        hits = get_scanner(EMAIL_KINDS | {TEL, SOCIAL}).scan(unescape(document.html))
+        regions = self.settings.get("regions_for_phones")
+
+        email_set = emails_from_hits(hits)
+        phone_set = extract_phone_numbers(html_to_text(document), regions)
+        tel_links = (hit.value for hit in hits if hit.kind == TEL)
+        phone_set.update(validate_phone_candidates(tel_links, regions))
+        social_map: Dict[str, Set[str]] = {}
+        for hit in hits:
+            if hit.kind == SOCIAL:
+                platform = social_platform(hit.value) or "other"
+                social_map.setdefault(platform.lower(), set()).add(hit.value)
 
         if not email_set and not phone_set and not any(social_map.values()):
             return []
@@ -198,19 +358,13 @@ class Crawler:
 
         return [base_record]
 
-    def _extract_links(self, base_url: str, html: str) -> List[str]:
-        soup = BeautifulSoup(html, "html.parser")
-        links: List[str] = []
-
-        for a in soup.find_all("a", href=True):
-            href = a["href"].strip()
-            if href.startswith("#") or href.lower().startswith("mailto:") or href.lower().startswith(
-                "tel:"
-            ):
-                continue
-            absolute = urljoin(base_url, href)
-            if is_valid_url(absolute):
-                links.append(absolute)
+    def _extract_links(self, base_url: str, html: str | PageDocument) -> List[Tuple[str, str]]:
+        """(canonical URL, anchor text) for every valid link on the page."""
+        links = [
+            (canonicalize_url(absolute), text)
+            for absolute, text in PageDocument.of(html, base_url).link_anchors
+            if is_valid_url(absolute)
+        ]
 
         logger.debug("Found %d candidate links on %s", len(links), base_url)
         return links
\ No newline at end of file
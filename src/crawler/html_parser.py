@@ -5,10 +5,11 @@ from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup
 
+from utils.frontier import score_link
 from utils.logger import get_logger
+from utils.page_document import PageDocument
 from utils.regex_patterns import (
     EMAIL_REGEX,
-    CONTACT_PAGE_KEYWORDS,
     SOCIAL_DOMAINS,
     SOCIAL_URL_REGEX,
 )
@@ -37,19 +38,18 @@ def _extract_cf_emails(soup: BeautifulSoup) -> List[str]:
             logger.debug("Failed to decode cfemail: %s", exc)
     return emails
 
-def extract_contacts(html: str, base_url: str) -> Dict:
-    soup = BeautifulSoup(html, "html.parser")
+def extract_contacts(html: str | PageDocument, base_url: str) -> Dict:
+    document = PageDocument.of(html, base_url)
+    soup = document.soup
 
-    text_content = soup.get_text(separator=" ", strip=True)
-    title_tag = soup.find("title")
-    page_title = title_tag.get_text(strip=True) if title_tag else ""
+    text_content = document.full_text
+    page_title = document.title
 
     # Emails: from text and mailto links
     emails = set()
 
     # 1) From mailto links
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
+    for href, _ in document.anchors:
         if href.startswith("mailto:"):
             candidate = href.split(":", 1)[1].split("?")[0]
             if EMAIL_REGEX.fullmatch(candidate):
@@ -68,21 +68,20 @@ def extract_contacts(html: str, base_url: str) -> Dict:
 
     # Social profiles
     social_profiles: Dict[str, str] = {}
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
+    for href, _ in document.anchors:
         if not href.lower().startswith("http"):
             href = urljoin(base_url, href)
 
         if not SOCIAL_URL_REGEX.match(href):
             continue
 
-        for platform, domain in SOCIAL_DOMAINS.items():
-            if domain in href.lower():
-                social_profiles.setdefault(platform, href)
+        for platform, domains in SOCIAL_DOMAINS.items():
+            if any(domain in href.lower() for domain in domains):
+                social_profiles.setdefault(platform.lower(), href)
                 break
 
     # Find candidate links for deeper crawling
-    candidate_links = find_candidate_links(html, base_url)
+    candidate_links = find_candidate_links(document, base_url)
 
     return {
         "emails": list(emails),
@@ -92,26 +91,22 @@ def extract_contacts(html: str, base_url: str) -> Dict:
         "candidateLinks": candidate_links,
     }
 
-def _score_candidate(href: str, text: str) -> int:
-    score = 0
-    haystack = (href + " " + text).lower()
-    for keyword in CONTACT_PAGE_KEYWORDS:
-        if keyword in haystack:
-            score += 1
-    return score
+def _score_candidate(href: str, text: str) -> float:
+    # Same scoring the crawl frontiers use, so candidates come out in fetch order
+    return score_link(href, text)
 
-def find_candidate_links(html: str, base_url: str, max_links: int = 15) -> List[str]:
+def find_candidate_links(
+    html: str | PageDocument, base_url: str, max_links: int = 15
+) -> List[str]:
     """
     Return a list of absolute URLs that are likely to contain contact information.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    links: List[Tuple[int, str]] = []
+    document = PageDocument.of(html, base_url)
+    links: List[Tuple[float, str]] = []
 
     base_domain = urlparse(base_url).netloc
 
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        text = a.get_text(" ", strip=True)
+    for href, text in document.anchors:
         absolute = urljoin(base_url, href)
 
         parsed = urlparse(absolute)
@@ -1,8 +1,8 @@
 thonfrom __future__ import annotations
 
-import asyncio
 from typing import Optional
 
+from core.browser_pool import get_browser_pool
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,18 +21,14 @@ def is_playwright_available() -> bool:
 async def render_page(url: str, timeout_ms: int = 15000) -> str:
     """
     Render a page with Playwright and return the full HTML.
+    Uses the shared BrowserPool, so the browser is reused across calls.
     If Playwright is not available, this will raise RuntimeError.
     """
     if not _PLAYWRIGHT_AVAILABLE or async_playwright is None:
         raise RuntimeError("Playwright is not installed or could not be imported.")
 
     logger.debug("Rendering %s with Playwright", url)
-    async with async_playwright() as p:  # type: ignore
-        browser = await p.chromium.launch(headless=True)
-        try:
-            page = await browser.new_page()
-            await page.goto(url, wait_until="networkidle", timeout=timeout_ms)
-            html = await page.content()
-            return html
-        finally:
-            await browser.close()
\ No newline at end of file
+    html = await get_browser_pool().render_async(url, timeout=timeout_ms / 1000)
+    if html is None:
+        raise RuntimeError(f"Playwright failed to render {url}")
+    return html
\ No newline at end of file
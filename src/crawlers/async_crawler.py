@@ -0,0 +1,421 @@
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from host_scheduler import HostScheduler  # type: ignore
+from utils.fetch_guard import CHUNK_SIZE, MAX_REDIRECTS, FetchGuard, UnwantedContent, decode_body
+from utils.http_cache import CachedResponse, HttpCache
+from utils.js_shell import js_shell_signals, looks_like_js_shell
+from utils.frontier import extract_anchor_links, score_link
+from utils.proxy_pool import BAN_STATUSES, NoProxyAvailable, ProxyLease, ProxyPool
+from utils.retry_policy import RetryPolicy
+from utils.saturation import SaturationPolicy, SaturationTracker
+from utils.site_discovery import SiteDiscovery
+from utils.transport import make_async_client
+from utils.url_canonicalizer import same_site, url_key
+from utils.url_fingerprint import UrlFrontier, make_visited_set, visited_set_size_hint
+
+logger = logging.getLogger(__name__)
+
+# on_page(root_url, page_url, body, encoding): hands raw page bytes to a
+# downstream stage (e.g. the extraction pipeline) as soon as they arrive.
+PageCallback = Callable[[str, str, bytes, Optional[str]], Awaitable[None]]
+
+# renderer(url) -> rendered HTML or None; used in adaptive mode.
+AsyncRenderer = Callable[[str], Awaitable[Optional[str]]]
+
+class AsyncCrawler:
+    """
+    Concurrent HTML crawler using asyncio + httpx.
+
+    - Crawls many root URLs at once and several pages per site at once.
+    - All fetches go through a HostScheduler: concurrent_requests caps the
+      requests in flight across the whole batch, and every host gets its own
+      token bucket and in-flight cap so hosts are interleaved politely.
+    - Produces the same page dicts as StaticCrawler.
+    - With a renderer (adaptive mode), pages that look like JavaScript app
+      shells are re-fetched through it.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: int = 15,
+        max_depth: int = 2,
+        max_pages_per_site: int = 15,
+        proxy: Optional[str] = None,
+        concurrent_requests: int = 4,
+        per_site_concurrency: int = 2,
+        max_active_sites: Optional[int] = None,
+        per_host_rate: float = 2.0,
+        per_host_burst: float = 2.0,
+        per_host_max_in_flight: int = 2,
+        renderer: Optional[AsyncRenderer] = None,
+        cache: Optional[HttpCache] = None,
+        visited_set: str = "fingerprint",
+        saturation: Optional[SaturationPolicy] = None,
+        discovery: Optional[SiteDiscovery] = None,
+        fetch_guard: Optional[FetchGuard] = None,
+        http2: bool = True,
+        retry: Optional[RetryPolicy] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+    ) -> None:
+        try:
+            import httpx  # type: ignore
+        except ImportError as exc:  # noqa: BLE001
+            raise RuntimeError(
+                "AsyncCrawler requires the 'httpx' package. "
+                "Install it with `pip install httpx`.",
+            ) from exc
+
+        self._httpx = httpx
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_depth = max_depth
+        self.max_pages_per_site = max_pages_per_site
+        self.proxy = proxy
+        self.concurrent_requests = max(1, concurrent_requests)
+        self.per_site_concurrency = max(1, per_site_concurrency)
+        # Keep enough sites active to saturate the global limit even when
+        # many of them are waiting on their host's rate limit.
+        self.max_active_sites = max_active_sites or self.concurrent_requests * 4
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.per_host_max_in_flight = per_host_max_in_flight
+        self.renderer = renderer
+        self.cache = cache
+        self.visited_set = visited_set
+        self.saturation = saturation
+        self.discovery = discovery
+        self.fetch_guard = fetch_guard or FetchGuard()
+        self.http2 = http2
+        self.retry = retry or RetryPolicy(timeout=timeout)
+        # A pool, when given, replaces the single proxy. httpx binds a
+        # proxy per client, so crawl_many opens one client per pool proxy.
+        self.proxy_pool = proxy_pool
+        self._proxy_clients: Dict[str, Any] = {}
+
+    def _same_domain(self, root: str, url: str) -> bool:
+        try:
+            return same_site(root, url)
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _extract_links(self, current_url: str, html: str) -> List[Tuple[str, str]]:
+        # Regex anchor extraction keeps the event loop free of parser work.
+        return extract_anchor_links(html, current_url)
+
+    def _make_client(self, proxy: Optional[str] = None) -> Any:
+        # One client for the whole batch: its keep-alive pool (and HTTP/2
+        # connections) are reused by every site on the same host.
+        return make_async_client(
+            self._httpx,
+            headers=self.headers,
+            timeout=self.timeout,
+            proxy=proxy or self.proxy,
+            max_connections=self.concurrent_requests,
+            http2=self.http2,
+        )
+
+    @contextlib.asynccontextmanager
+    async def _open_proxy_clients(self) -> AsyncIterator[None]:
+        async with contextlib.AsyncExitStack() as stack:
+            for proxy in self.proxy_pool.urls if self.proxy_pool is not None else []:
+                self._proxy_clients[proxy] = await stack.enter_async_context(
+                    self._make_client(proxy)
+                )
+            try:
+                yield
+            finally:
+                self._proxy_clients = {}
+
+    async def _route(self, client: Any) -> Tuple[Any, Optional[ProxyLease]]:
+        """The client to send a request with and, with a proxy pool, its lease."""
+        if not self._proxy_clients:
+            return client, None
+        try:
+            lease = await self.proxy_pool.acquire_async()
+        except NoProxyAvailable as exc:
+            raise self._httpx.ConnectError(str(exc)) from exc
+        return self._proxy_clients[lease.proxy], lease
+
+    def _make_scheduler(self) -> HostScheduler:
+        return HostScheduler(
+            max_in_flight=self.concurrent_requests,
+            per_host_rate=self.per_host_rate,
+            per_host_burst=self.per_host_burst,
+            per_host_max_in_flight=self.per_host_max_in_flight,
+        )
+
+    async def _fetch(
+        self,
+        client: Any,
+        scheduler: HostScheduler,
+        url: str,
+        allowed: Optional[Callable[[str], bool]] = None,
+    ) -> Tuple[str, bytes, Optional[str]]:
+        """
+        Return (text, raw body, encoding) for url. Redirects are followed
+        here, not by httpx, so every target passes the fetch guard and
+        allowed (the site's robots.txt) before it is requested.
+        """
+        self.fetch_guard.check_url(url)
+        # The cache is SQLite, so its calls run in a worker thread and a
+        # slow disk or a commit never stalls the other fetches on the loop
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            logger.debug("Async crawler serving %s from cache", url)
+            return cached.text, cached.body, cached.encoding
+
+        logger.debug("Async crawler fetching %s", url)
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            resp, body = await self._get(client, scheduler, target, cached if target == url else None)
+            if body is not None:
+                break
+            if not resp.has_redirect_location:
+                await asyncio.to_thread(self.cache.revalidated, url, resp.headers)
+                return cached.text, cached.body, cached.encoding
+            target = self.fetch_guard.check_redirect(target, resp.headers["Location"], allowed)
+        else:
+            raise self._httpx.TooManyRedirects(f"{url}: more than {MAX_REDIRECTS} redirects")
+
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.store, url, resp.status_code, resp.headers, body)
+        encoding = resp.charset_encoding
+        return decode_body(body, encoding), body, encoding
+
+    async def _get(
+        self, client: Any, scheduler: HostScheduler, url: str, cached: Optional[CachedResponse]
+    ) -> Tuple[Any, Optional[bytes]]:
+        """
+        One request for url, retried per the retry policy. The body is None
+        for a redirect, or for a 304 on the cached entry.
+        """
+        headers = HttpCache.conditional_headers(cached)
+        attempt = 0
+        banned_by: Set[str] = set()
+        while True:
+            timeout = self.retry.begin(url, attempt)
+            try:
+                # The proxy is leased once the host slot is granted, so the
+                # politeness wait counts against neither its slot nor its latency
+                async with scheduler.slot(url):
+                    routed, lease = await self._route(client)
+                    started = time.monotonic()
+                    # Streamed, so headers are checked before any of the body is read
+                    async with lease or contextlib.nullcontext(), routed.stream(
+                        "GET", url, headers=headers, timeout=timeout, follow_redirects=False
+                    ) as resp:
+                        if lease:
+                            lease.observe(resp.status_code)
+                        self.retry.record(url, time.monotonic() - started)
+                        if resp.has_redirect_location or (resp.status_code == 304 and cached is not None):
+                            return resp, None
+                        status: Optional[int] = resp.status_code
+                        if lease and status in BAN_STATUSES:
+                            banned_by.add(lease.proxy)
+                            if not self.proxy_pool.page_banned(banned_by):
+                                status = None  # maybe the exit IP; retry through another proxy
+                        delay = self.retry.retry_delay(attempt, status, resp.headers)
+                        if delay is None:
+                            resp.raise_for_status()
+                            self.fetch_guard.check_headers(url, resp.headers)
+                            body = await self.fetch_guard.read_async(
+                                url, resp.aiter_bytes(CHUNK_SIZE)
+                            )
+                            return resp, body
+                        reason = f"HTTP {resp.status_code}"
+            except self._httpx.TransportError as exc:
+                if isinstance(exc, self._httpx.TimeoutException):
+                    self.retry.record(url, timeout)
+                delay = self.retry.retry_delay(attempt)
+                if delay is None:
+                    raise
+                reason = type(exc).__name__
+            attempt += 1
+            logger.debug("Retrying %s in %.1fs after %s (retry %d)", url, delay, reason, attempt)
+            # Back off outside the host slot so other requests can use it
+            await asyncio.sleep(delay)
+
+    async def _fetch_discovery(
+        self, client: Any, scheduler: HostScheduler, url: str
+    ) -> Optional[bytes]:
+        async with scheduler.slot(url):
+            routed, lease = await self._route(client)
+            async with lease or contextlib.nullcontext():
+                resp = await routed.get(url)
+                if lease:
+                    lease.observe(resp.status_code)
+        return resp.content if resp.status_code == 200 else None
+
+    async def _render_if_shell(self, url: str, html: str) -> Optional[str]:
+        """Rendered HTML when url looks like a JS shell and rendering worked, else None."""
+        if self.renderer is None or not looks_like_js_shell(html):
+            return None
+        logger.debug("Rendering %s (JS shell signals: %s)", url, js_shell_signals(html))
+        return await self.renderer(url)
+
+    async def crawl_site(
+        self,
+        root_url: str,
+        client: Any,
+        scheduler: HostScheduler,
+        on_page: Optional[PageCallback] = None,
+    ) -> List[Dict[str, Any]]:
+        # Best-first: entries are (-score, seq, packed URL), so workers always
+        # take the most promising queued link. The frontier only packs URLs.
+        frontier = UrlFrontier(root_url)
+        visited = make_visited_set(self.visited_set, visited_set_size_hint(self.max_pages_per_site))
+        visited.add(url_key(root_url))
+        queue: asyncio.PriorityQueue[Tuple[float, int, bytes]] = asyncio.PriorityQueue()
+        seq = itertools.count()
+        queue.put_nowait((0.0, next(seq), frontier.pack(root_url, 0)))
+        site = None
+        if self.discovery is not None:
+            site = await self.discovery.discover_async(
+                root_url, lambda url: self._fetch_discovery(client, scheduler, url)
+            )
+            # Sitemap pages that look like contact pages skip the link hops
+            for seed, score in site.seeds:
+                if visited.add(url_key(seed)):
+                    queue.put_nowait((-score, next(seq), frontier.pack(seed, 1)))
+        pages: List[Dict[str, Any]] = []
+        tracker = SaturationTracker(self.saturation) if self.saturation else None
+
+        def done() -> bool:
+            return len(pages) >= self.max_pages_per_site or bool(tracker and tracker.reason)
+
+        async def visit(current_url: str, depth: int) -> None:
+            if done():
+                return
+            if site is not None and not site.allowed(current_url):
+                logger.debug("Skipping %s (disallowed by robots.txt)", current_url)
+                return
+            try:
+                html, body, encoding = await self._fetch(
+                    client, scheduler, current_url, site.allowed if site is not None else None
+                )
+            except UnwantedContent as exc:
+                logger.debug("Skipping %s", exc)
+                return
+            except self._httpx.HTTPError as exc:
+                logger.warning("Failed to fetch %s: %s", current_url, exc)
+                return
+            rendered = await self._render_if_shell(current_url, html)
+            if rendered:
+                html = rendered
+                body, encoding = rendered.encode("utf-8"), "utf-8"
+
+            if len(pages) >= self.max_pages_per_site:
+                return
+            pages.append(
+                {
+                    "root_url": root_url,
+                    "url": current_url,
+                    "html": html,
+                }
+            )
+            if on_page is not None:
+                await on_page(root_url, current_url, body, encoding)
+            if tracker is not None and not tracker.reason and tracker.observe_html(html):
+                logger.info("Stopping %s early: %s", root_url, tracker.describe())
+                return
+
+            if depth >= self.max_depth or done():
+                return
+
+            for link, text in self._extract_links(current_url, html):
+                if not self._same_domain(root_url, link) or not visited.add(url_key(link)):
+                    continue
+                score = score_link(link, text, depth + 1)
+                queue.put_nowait((-score, next(seq), frontier.pack(link, depth + 1)))
+
+        async def worker() -> None:
+            while True:
+                current_url, depth = frontier.unpack((await queue.get())[2])
+                try:
+                    await visit(current_url, depth)
+                except Exception as exc:  # noqa: BLE001
+                    # One bad page (invalid URL, renderer or on_page failure)
+                    # must not take its worker down and leave queue.join() waiting
+                    logger.warning("Error while crawling %s: %s", current_url, exc)
+                finally:
+                    queue.task_done()
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(self.per_site_concurrency)
+        ]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        logger.debug(
+            "Async crawler finished %s with %d page(s).",
+            root_url,
+            len(pages),
+        )
+        return pages
+
+    async def _crawl_site_safe(
+        self,
+        root_url: str,
+        client: Any,
+        scheduler: HostScheduler,
+        on_page: Optional[PageCallback] = None,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        try:
+            pages = await self.crawl_site(root_url, client, scheduler, on_page)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to crawl %s: %s", root_url, exc)
+            pages = []
+        return root_url, pages
+
+    async def crawl_many(
+        self,
+        root_urls: Iterable[str],
+        on_page: Optional[PageCallback] = None,
+    ) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Crawl all root URLs concurrently, yielding (root_url, pages) as each
+        site finishes. Sites are started lazily so large inputs stay cheap.
+        If on_page is given it is awaited with every fetched page's raw body.
+        """
+        scheduler = self._make_scheduler()
+        url_iter = iter(root_urls)
+        pending: Set[asyncio.Task] = set()
+
+        async with self._make_client() as client, self._open_proxy_clients():
+
+            def start_next() -> bool:
+                for root_url in url_iter:
+                    pending.add(
+                        asyncio.create_task(
+                            self._crawl_site_safe(root_url, client, scheduler, on_page)
+                        )
+                    )
+                    return True
+                return False
+
+            while len(pending) < self.max_active_sites and start_next():
+                pass
+
+            try:
+                while pending:
+                    done, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        pending.discard(task)
+                        start_next()
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
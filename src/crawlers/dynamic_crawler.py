@@ -1,8 +1,22 @@
 thonimport logging
-from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Type
-from urllib.parse import urljoin, urlparse
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import requests
+
+from core.browser_pool import (
+    BrowserPool,
+    get_browser_pool,
+    get_render_profile,
+    is_playwright_available,
+)
+from utils.fetch_guard import MAX_REDIRECTS, FetchGuard, UnwantedContent
+from utils.frontier import BestFirstFrontier, extract_anchor_links
+from utils.saturation import SaturationPolicy, SaturationTracker
+from utils.site_discovery import SiteDiscovery
+from utils.transport import get_http_session
+from utils.url_canonicalizer import same_site, url_key
+from utils.url_fingerprint import VisitedSet, make_visited_set, visited_set_size_hint
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +28,11 @@ class PageResult:
 
 class DynamicCrawler:
     """
-    JavaScript-capable crawler using requests-html (PyPPeteer under the hood).
+    JavaScript-capable crawler.
+
+    Pages are rendered in the shared Playwright BrowserPool when Playwright is
+    installed, up to render_concurrency at a time; otherwise it falls back to
+    requests-html (PyPPeteer under the hood), one page at a time.
 
     It behaves similarly to StaticCrawler but renders pages, which improves
     extraction on JavaScript-heavy websites.
@@ -28,109 +46,197 @@ class DynamicCrawler:
         max_pages_per_site: int = 15,
         proxy: Optional[str] = None,
         render_timeout: int = 15,
+        render_concurrency: int = 4,
+        browser_pool: Optional[BrowserPool] = None,
+        render_profile: str = "lean",
+        visited_set: str = "fingerprint",
+        saturation: Optional[SaturationPolicy] = None,
+        discovery: Optional[SiteDiscovery] = None,
+        fetch_guard: Optional[FetchGuard] = None,
     ) -> None:
-        try:
-            from requests_html import HTMLSession  # type: ignore
-        except ImportError as exc:  # noqa: BLE001
-            raise RuntimeError(
-                "DynamicCrawler requires the 'requests-html' package. "
-                "Install it with `pip install requests-html`.",
-            ) from exc
-
-        self._HTMLSession: Type[HTMLSession] = HTMLSession  # type: ignore[name-defined]
         self.headers = headers or {}
+        self.render_concurrency = max(1, render_concurrency)
+        self.browser_pool = browser_pool
+        if self.browser_pool is None and is_playwright_available():
+            self.browser_pool = get_browser_pool(
+                size=self.render_concurrency,
+                user_agent=self.headers.get("User-Agent"),
+                proxy=proxy,
+                profile=get_render_profile(render_profile),
+            )
+
+        self._HTMLSession: Optional[Type[Any]] = None
+        if self.browser_pool is None:
+            try:
+                from requests_html import HTMLSession  # type: ignore
+            except ImportError as exc:  # noqa: BLE001
+                raise RuntimeError(
+                    "DynamicCrawler requires the 'playwright' or 'requests-html' package. "
+                    "Install one with `pip install playwright` or `pip install requests-html`.",
+                ) from exc
+            self._HTMLSession = HTMLSession
+
         self.timeout = timeout
         self.max_depth = max_depth
         self.max_pages_per_site = max_pages_per_site
         self.proxies = {"http": proxy, "https": proxy} if proxy else None
         self.render_timeout = render_timeout
+        # requests-html has no request interception; the lean profile at
+        # least drops the fixed settle delay after each render.
+        self.render_sleep = 0 if render_profile == "lean" else 1
+        self.visited_set = visited_set
+        self.saturation = saturation
+        self.discovery = discovery
+        # Only the URL check applies; rendered pages are not downloaded here
+        self.fetch_guard = fetch_guard or FetchGuard()
 
     def _same_domain(self, root: str, url: str) -> bool:
         try:
-            root_host = urlparse(root).netloc.lower()
-            url_host = urlparse(url).netloc.lower()
-            return root_host == url_host
+            return same_site(root, url)
         except Exception:  # noqa: BLE001
             return False
 
-    def _extract_links_from_html(self, current_url: str, html: str) -> List[str]:
-        # Simple href extraction without a full HTML parser to keep this lean.
-        import re  # local import to keep dependencies minimal
-
-        href_pattern = re.compile(r'href=["\'](.*?)["\']', re.IGNORECASE)
-        links: List[str] = []
-        for match in href_pattern.finditer(html):
-            href = match.group(1).strip()
-            if not href or href.startswith("#") or href.lower().startswith("mailto:"):
-                continue
-            abs_url = urljoin(current_url, href)
-            links.append(abs_url)
-        return links
-
-    def _fetch(self, session, url: str) -> str:
+    def _extract_links_from_html(self, current_url: str, html: str) -> List[Tuple[str, str]]:
+        # Simple anchor extraction without a full HTML parser to keep this lean.
+        return extract_anchor_links(html, current_url)
+
+    def _fetch(self, session, url: str, allowed: Optional[Callable[[str], bool]] = None) -> str:
         logger.debug("Dynamic crawler fetching %s", url)
-        resp = session.get(url, timeout=self.timeout, allow_redirects=True, proxies=self.proxies)
-        resp.html.render(timeout=self.render_timeout, reload=False, sleep=1)
+        # Redirects are followed here so every target is checked first
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = session.get(target, timeout=self.timeout, allow_redirects=False, proxies=self.proxies)
+            if not resp.is_redirect:
+                break
+            target = self.fetch_guard.check_redirect(target, resp.headers["Location"], allowed)
+        else:
+            raise requests.TooManyRedirects(f"{url}: more than {MAX_REDIRECTS} redirects")
+        resp.html.render(timeout=self.render_timeout, reload=False, sleep=self.render_sleep)
         return resp.html.html
 
-    def crawl(self, root_url: str) -> List[Dict[str, Any]]:
-        session = self._HTMLSession()
-        session.headers.update(self.headers)
+    def _fetch_discovery(self, url: str) -> Optional[bytes]:
+        # robots.txt and sitemaps need no rendering
+        resp = get_http_session().get(
+            url, headers=self.headers, timeout=self.timeout, proxies=self.proxies
+        )
+        return resp.content if resp.status_code == 200 else None
 
-        visited: set[str] = set()
-        queue: deque[tuple[str, int]] = deque()
-        queue.append((root_url, 0))
+    def _fetch_batch(
+        self, session, urls: List[str], allowed: Optional[Callable[[str], bool]] = None
+    ) -> List[Optional[str]]:
+        if self.browser_pool is not None:
+            logger.debug("Dynamic crawler rendering %d page(s) in the browser pool", len(urls))
+            return self.browser_pool.render_many(urls, timeout=self.render_timeout, allowed=allowed)
+
+        htmls: List[Optional[str]] = []
+        for url in urls:
+            try:
+                htmls.append(self._fetch(session, url, allowed))
+            except UnwantedContent as exc:
+                logger.debug("Skipping %s", exc)
+                htmls.append(None)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Dynamic crawler failed to fetch %s: %s", url, exc)
+                htmls.append(None)
+        return htmls
+
+    def crawl(self, root_url: str) -> List[Dict[str, Any]]:
+        session = None
+        if self._HTMLSession is not None:
+            session = self._HTMLSession()
+            session.headers.update(self.headers)
+
+        # URLs are marked seen when queued, so each is queued at most once
+        seen = make_visited_set(self.visited_set, visited_set_size_hint(self.max_pages_per_site))
+        frontier = BestFirstFrontier(root_url)
+        seen.add(url_key(root_url))
+        frontier.push(root_url, 0)
+        site = self.discovery.discover(root_url, self._fetch_discovery) if self.discovery else None
+        if site is not None:
+            # Sitemap pages that look like contact pages skip the link hops
+            for seed, score in site.seeds:
+                if seen.add(url_key(seed)):
+                    frontier.push(seed, 1, score=score)
         pages: List[Dict[str, Any]] = []
+        tracker = SaturationTracker(self.saturation) if self.saturation else None
 
         try:
-            while queue and len(pages) < self.max_pages_per_site:
-                current_url, depth = queue.popleft()
-                if current_url in visited:
-                    continue
-                visited.add(current_url)
+            while frontier and len(pages) < self.max_pages_per_site:
+                # Take up to render_concurrency pages off the queue and render them together
+                batch: List[Tuple[str, int]] = []
+                batch_size = min(self.render_concurrency, self.max_pages_per_site - len(pages))
+                while frontier and len(batch) < batch_size:
+                    current_url, depth = frontier.pop()
 
-                if depth > self.max_depth:
-                    continue
+                    if depth > self.max_depth:
+                        continue
 
-                if not self._same_domain(root_url, current_url):
-                    continue
+                    if not self._same_domain(root_url, current_url):
+                        continue
 
-                try:
-                    html = self._fetch(session, current_url)
-                except Exception as exc:  # noqa: BLE001
-                    logger.warning("Dynamic crawler failed to fetch %s: %s", current_url, exc)
+                    if site is not None and not site.allowed(current_url):
+                        logger.debug("Skipping %s (disallowed by robots.txt)", current_url)
+                        continue
+
+                    try:
+                        self.fetch_guard.check_url(current_url)
+                    except UnwantedContent as exc:
+                        logger.debug("Skipping %s", exc)
+                        continue
+
+                    batch.append((current_url, depth))
+
+                if not batch:
                     continue
 
-                pages.append(
-                    {
-                        "root_url": root_url,
-                        "url": current_url,
-                        "html": html,
-                    }
+                htmls = self._fetch_batch(
+                    session, [url for url, _ in batch], site.allowed if site is not None else None
                 )
-
-                links = self._extract_links_from_html(current_url, html)
-                prioritized = []
-                others = []
-                for link in links:
-                    lower = link.lower()
-                    if any(key in lower for key in ("contact", "imprint", "about", "team")):
-                        prioritized.append(link)
-                    else:
-                        others.append(link)
-
-                for link in prioritized + others:
-                    if link not in visited:
-                        queue.append((link, depth + 1))
+                for (current_url, depth), html in zip(batch, htmls):
+                    if html is None:
+                        logger.warning("Dynamic crawler failed to fetch %s", current_url)
+                        continue
+                    self._add_page(root_url, current_url, depth, html, pages, seen, frontier)
+                    if tracker is not None and tracker.observe_html(html):
+                        break
+                if tracker is not None and tracker.reason:
+                    logger.info("Stopping %s early: %s", root_url, tracker.describe())
+                    break
         finally:
-            try:
-                session.close()
-            except Exception:  # noqa: BLE001
-                pass
+            if session is not None:
+                try:
+                    session.close()
+                except Exception:  # noqa: BLE001
+                    pass
 
         logger.debug(
             "Dynamic crawler finished %s with %d page(s).",
             root_url,
             len(pages),
         )
-        return pages
\ No newline at end of file
+        return pages
+
+    def _add_page(
+        self,
+        root_url: str,
+        current_url: str,
+        depth: int,
+        html: str,
+        pages: List[Dict[str, Any]],
+        seen: VisitedSet,
+        frontier: BestFirstFrontier,
+    ) -> None:
+        pages.append(
+            {
+                "root_url": root_url,
+                "url": current_url,
+                "html": html,
+            }
+        )
+
+        if depth >= self.max_depth:
+            return
+        # Best-first: likely contact pages are popped before anything else
+        for link, text in self._extract_links_from_html(current_url, html):
+            if seen.add(url_key(link)):
+                frontier.push(link, depth + 1, text)
\ No newline at end of file
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate <= 0:
+            self.tokens = self.capacity
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+@dataclass
+class _HostState:
+    bucket: TokenBucket
+    in_flight: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+
+class HostScheduler:
+    """
+    Central politeness scheduler for concurrent crawls.
+
+    - Every host has its own token bucket (per_host_rate requests/second,
+      bursts of per_host_burst) and its own in-flight cap.
+    - max_in_flight caps requests across all hosts.
+    - Grants are handed out round-robin over hosts that are ready, so a slow
+      or rate-limited host only delays its own requests.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        per_host_rate: float = 2.0,
+        per_host_burst: float = 2.0,
+        per_host_max_in_flight: int = 2,
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.per_host_max_in_flight = max(1, per_host_max_in_flight)
+
+        self._hosts: Dict[str, _HostState] = {}
+        self._ready: Deque[str] = deque()
+        self._queued: Set[str] = set()
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at = 0.0
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(bucket=TokenBucket(self.per_host_rate, self.per_host_burst))
+            self._hosts[host] = state
+        return state
+
+    def _mark_ready(self, host: str) -> None:
+        if host not in self._queued:
+            self._queued.add(host)
+            self._ready.append(host)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._timer is not None and self._timer_at <= when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = when
+        self._timer = loop.call_at(when, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant as many waiting requests as the limits allow, one per host per pass."""
+        next_wakeup: Optional[float] = None
+        granted = True
+        while granted and self._ready and self._in_flight < self.max_in_flight:
+            granted = False
+            now = time.monotonic()
+            for _ in range(len(self._ready)):
+                if self._in_flight >= self.max_in_flight:
+                    break
+                host = self._ready.popleft()
+                state = self._hosts.get(host)
+                while state and state.waiters and state.waiters[0].done():
+                    state.waiters.popleft()  # cancelled while waiting
+                if not state or not state.waiters:
+                    self._queued.discard(host)
+                    if state and not state.in_flight and state.bucket.is_full(now):
+                        del self._hosts[host]
+                    continue
+
+                self._ready.append(host)
+                if state.in_flight >= self.per_host_max_in_flight:
+                    continue
+                delay = state.bucket.delay(now)
+                if delay > 0:
+                    next_wakeup = delay if next_wakeup is None else min(next_wakeup, delay)
+                    continue
+
+                state.bucket.consume(now)
+                state.in_flight += 1
+                self._in_flight += 1
+                state.waiters.popleft().set_result(None)
+                granted = True
+
+        if next_wakeup is not None and self._in_flight < self.max_in_flight:
+            self._schedule_wakeup(next_wakeup)
+
+    async def acquire(self, url: str) -> str:
+        """Wait until a request to url's host may start. Returns the host key."""
+        host = self.host_key(url)
+        state = self._state(host)
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        self._mark_ready(host)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(host)
+            raise
+        return host
+
+    def release(self, host: str) -> None:
+        state = self._hosts.get(host)
+        if state is None:
+            return
+        state.in_flight -= 1
+        self._in_flight -= 1
+        if not state.in_flight and not state.waiters and state.bucket.is_full(time.monotonic()):
+            # Idle hosts are dropped so long batches do not accumulate state.
+            del self._hosts[host]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = await self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(host)
@@ -1,11 +1,23 @@
 thonimport logging
-from collections import deque
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin, urlparse
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Set, Tuple
 
 import requests
-from bs4 import BeautifulSoup
+
+from utils.fetch_guard import CHUNK_SIZE, MAX_REDIRECTS, FetchGuard, UnwantedContent, decode_body
+from utils.http_cache import CachedResponse, HttpCache
+from utils.js_shell import js_shell_signals, looks_like_js_shell
+from utils.page_document import PageDocument
+from utils.proxy_pool import BAN_STATUSES, NoProxyAvailable, ProxyLease, ProxyPool
+from utils.retry_policy import RetryPolicy
+from utils.saturation import SaturationPolicy, SaturationTracker
+from utils.site_discovery import SiteDiscovery
+from utils.transport import get_http_session
+from utils.url_canonicalizer import canonicalize_url, same_site, url_key
+from utils.frontier import BestFirstFrontier
+from utils.url_fingerprint import make_visited_set, visited_set_size_hint
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +32,11 @@ class StaticCrawler:
     Lightweight HTML crawler using requests + BeautifulSoup.
 
     - Restricts crawling to the same domain as the root URL.
-    - Breadth-first up to max_depth and max_pages_per_site.
+    - Best-first up to max_depth and max_pages_per_site: the queued link
+      scored most likely to hold contacts (utils.frontier.score_link) is
+      fetched next.
+    - With a renderer (adaptive mode), pages that look like JavaScript app
+      shells are re-fetched through it; everything else stays static.
     """
 
     def __init__(
@@ -30,53 +46,168 @@ class StaticCrawler:
         max_depth: int = 2,
         max_pages_per_site: int = 15,
         proxy: Optional[str] = None,
+        renderer: Optional[Callable[[str], Optional[str]]] = None,
+        cache: Optional[HttpCache] = None,
+        visited_set: str = "fingerprint",
+        saturation: Optional[SaturationPolicy] = None,
+        discovery: Optional[SiteDiscovery] = None,
+        fetch_guard: Optional[FetchGuard] = None,
+        session: Optional[requests.Session] = None,
+        retry: Optional[RetryPolicy] = None,
+        proxy_pool: Optional[ProxyPool] = None,
     ) -> None:
         self.headers = headers or {}
         self.timeout = timeout
         self.max_depth = max_depth
         self.max_pages_per_site = max_pages_per_site
         self.proxies = {"http": proxy, "https": proxy} if proxy else None
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.renderer = renderer
+        self.cache = cache
+        self.visited_set = visited_set
+        self.saturation = saturation
+        self.discovery = discovery
+        self.fetch_guard = fetch_guard or FetchGuard()
+        # Shared keep-alive pools; headers go with each request instead
+        self.session = session or get_http_session()
+        self.retry = retry or RetryPolicy(timeout=timeout)
+        # A pool, when given, replaces the single proxy
+        self.proxy_pool = proxy_pool
 
     def _same_domain(self, root: str, url: str) -> bool:
         try:
-            root_host = urlparse(root).netloc.lower()
-            url_host = urlparse(url).netloc.lower()
-            return root_host == url_host
+            return same_site(root, url)
         except Exception:  # noqa: BLE001
             return False
 
-    def _extract_links(self, current_url: str, html: str) -> List[str]:
-        soup = BeautifulSoup(html, "html.parser")
-        links: List[str] = []
+    def _extract_links(self, current_url: str, html: str | PageDocument) -> List[Tuple[str, str]]:
+        """(canonical URL, anchor text) for every link on the page."""
+        return [
+            (canonicalize_url(link), text)
+            for link, text in PageDocument.of(html, current_url).link_anchors
+        ]
 
-        for a in soup.find_all("a", href=True):
-            href = a["href"].strip()
-            if not href or href.startswith("#") or href.lower().startswith("mailto:"):
-                continue
-            abs_url = urljoin(current_url, href)
-            links.append(abs_url)
+    def _proxy_lease(self) -> ContextManager[Optional[ProxyLease]]:
+        if self.proxy_pool is None:
+            return nullcontext()
+        try:
+            return self.proxy_pool.acquire()
+        except NoProxyAvailable as exc:
+            raise requests.ConnectionError(str(exc)) from exc
 
-        return links
+    def _fetch(self, url: str, allowed: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Text of url. Redirects are followed here, not by requests, so every
+        target passes the fetch guard and allowed (the site's robots.txt)
+        before it is requested.
+        """
+        self.fetch_guard.check_url(url)
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            logger.debug("Static crawler serving %s from cache", url)
+            return cached.text
 
-    def _fetch(self, url: str) -> str:
         logger.debug("Static crawler fetching %s", url)
-        resp = self.session.get(url, timeout=self.timeout, allow_redirects=True, proxies=self.proxies)
-        resp.raise_for_status()
-        return resp.text
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            resp, body = self._get(target, cached if target == url else None)
+            if body is not None:
+                break
+            if not resp.is_redirect:
+                self.cache.revalidated(url, resp.headers)
+                return cached.text
+            target = self.fetch_guard.check_redirect(target, resp.headers["Location"], allowed)
+        else:
+            raise requests.TooManyRedirects(f"{url}: more than {MAX_REDIRECTS} redirects")
+
+        if self.cache is not None:
+            self.cache.store(url, resp.status_code, resp.headers, body)
+        return decode_body(body, resp.encoding)
+
+    def _get(
+        self, url: str, cached: Optional[CachedResponse]
+    ) -> Tuple[requests.Response, Optional[bytes]]:
+        """
+        One request for url, retried per the retry policy. The body is None
+        for a redirect, or for a 304 on the cached entry.
+        """
+        attempt = 0
+        banned_by: Set[str] = set()
+        while True:
+            timeout = self.retry.begin(url, attempt)
+            started = time.monotonic()
+            try:
+                # Streamed, so headers are checked before any of the body is read
+                with self._proxy_lease() as lease, self.session.get(
+                    url,
+                    headers={**self.headers, **HttpCache.conditional_headers(cached)},
+                    timeout=timeout,
+                    allow_redirects=False,
+                    proxies=lease.proxies if lease else self.proxies,
+                    stream=True,
+                ) as resp:
+                    if lease:
+                        lease.observe(resp.status_code)
+                    self.retry.record(url, time.monotonic() - started)
+                    if resp.is_redirect or (resp.status_code == 304 and cached is not None):
+                        return resp, None
+                    status: Optional[int] = resp.status_code
+                    if lease and status in BAN_STATUSES:
+                        banned_by.add(lease.proxy)
+                        if not self.proxy_pool.page_banned(banned_by):
+                            status = None  # maybe the exit IP; retry through another proxy
+                    delay = self.retry.retry_delay(attempt, status, resp.headers)
+                    if delay is None:
+                        resp.raise_for_status()
+                        self.fetch_guard.check_headers(url, resp.headers)
+                        return resp, self.fetch_guard.read(url, resp.iter_content(CHUNK_SIZE))
+                    reason = f"HTTP {resp.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if isinstance(exc, requests.Timeout):
+                    self.retry.record(url, timeout)
+                delay = self.retry.retry_delay(attempt)
+                if delay is None:
+                    raise
+                reason = type(exc).__name__
+            attempt += 1
+            logger.debug("Retrying %s in %.1fs after %s (retry %d)", url, delay, reason, attempt)
+            time.sleep(delay)
+
+    def _fetch_discovery(self, url: str) -> Optional[bytes]:
+        with self._proxy_lease() as lease:
+            resp = self.session.get(
+                url,
+                headers=self.headers,
+                timeout=self.timeout,
+                proxies=lease.proxies if lease else self.proxies,
+            )
+            if lease:
+                lease.observe(resp.status_code)
+        return resp.content if resp.status_code == 200 else None
+
+    def _render_if_shell(self, url: str, html: str) -> str:
+        if self.renderer is None or not looks_like_js_shell(html):
+            return html
+        logger.debug("Rendering %s (JS shell signals: %s)", url, js_shell_signals(html))
+        rendered = self.renderer(url)
+        return rendered or html
 
     def crawl(self, root_url: str) -> List[Dict[str, Any]]:
-        visited: set[str] = set()
-        queue: deque[tuple[str, int]] = deque()
-        queue.append((root_url, 0))
+        # URLs are marked seen when queued, so each is queued at most once
+        seen = make_visited_set(self.visited_set, visited_set_size_hint(self.max_pages_per_site))
+        frontier = BestFirstFrontier(root_url)
+        seen.add(url_key(root_url))
+        frontier.push(root_url, 0)
+        site = self.discovery.discover(root_url, self._fetch_discovery) if self.discovery else None
+        if site is not None:
+            # Sitemap pages that look like contact pages skip the link hops
+            for seed, score in site.seeds:
+                if seen.add(url_key(seed)):
+                    frontier.push(seed, 1, score=score)
         pages: List[Dict[str, Any]] = []
+        tracker = SaturationTracker(self.saturation) if self.saturation else None
 
-        while queue and len(pages) < self.max_pages_per_site:
-            current_url, depth = queue.popleft()
-            if current_url in visited:
-                continue
-            visited.add(current_url)
+        while frontier and len(pages) < self.max_pages_per_site:
+            current_url, depth = frontier.pop()
 
             if depth > self.max_depth:
                 continue
@@ -84,34 +215,40 @@ class StaticCrawler:
             if not self._same_domain(root_url, current_url):
                 continue
 
+            if site is not None and not site.allowed(current_url):
+                logger.debug("Skipping %s (disallowed by robots.txt)", current_url)
+                continue
+
             try:
-                html = self._fetch(current_url)
+                html = self._fetch(current_url, site.allowed if site is not None else None)
+            except UnwantedContent as exc:
+                logger.debug("Skipping %s", exc)
+                continue
             except requests.RequestException as exc:
                 logger.warning("Failed to fetch %s: %s", current_url, exc)
                 continue
+            html = self._render_if_shell(current_url, html)
 
+            # The parsed document travels with the page so extractors reuse it
+            document = PageDocument(html, current_url)
             pages.append(
                 {
                     "root_url": root_url,
                     "url": current_url,
                     "html": html,
+                    "document": document,
                 }
             )
+            if tracker is not None and tracker.observe_html(html):
+                logger.info("Stopping %s early: %s", root_url, tracker.describe())
+                break
 
-            # Prioritize likely contact pages by enqueuing them earlier
-            links = self._extract_links(current_url, html)
-            prioritized = []
-            others = []
-            for link in links:
-                lower = link.lower()
-                if any(key in lower for key in ("contact", "imprint", "about", "team")):
-                    prioritized.append(link)
-                else:
-                    others.append(link)
-
-            for link in prioritized + others:
-                if link not in visited:
-                    queue.append((link, depth + 1))
+            if depth >= self.max_depth:
+                continue
+            # Best-first: likely contact pages are popped before anything else
+            for link, text in self._extract_links(current_url, document):
+                if seen.add(url_key(link)):
+                    frontier.push(link, depth + 1, text)
 
         logger.debug(
             "Static crawler finished %s with %d page(s).",
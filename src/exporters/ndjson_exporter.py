@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+class NdjsonExporter:
+    """
+    Streaming exporter that writes one JSON record per line as records arrive.
+
+    Records are never held in memory. The file is flushed every flush_every
+    records or flush_seconds, whichever comes first, so it can be tailed
+    while the crawl runs. With fsync=True each flush is also forced to disk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        append: bool = False,
+        flush_every: int = 100,
+        flush_seconds: float = 1.0,
+        fsync: bool = False,
+    ) -> None:
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self.count = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._fh = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.count += 1
+            self._unflushed += 1
+        if (
+            self._unflushed >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self.flush()
+        self._fh.close()
+        logger.info("Exported %d record(s) to %s", self.count, self.path)
+
+    def __enter__(self) -> "NdjsonExporter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def iter_ndjson_records(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Records from NDJSON files in order; a torn last line (from a killed writer) is skipped."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable line %d in %s", line_no, path)
@@ -0,0 +1,249 @@
+import bisect
+import importlib
+import importlib.util
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import unquote
+
+from utils.email_anchors import at_anchors, iter_anchored_matches
+from utils.regex_patterns import EMAIL_REGEX, SOCIAL_DOMAINS
+
+logger = logging.getLogger(__name__)
+
+# Hit kinds, in the order their alternatives are tried at each position
+# (EMAIL is found separately, around '@' anchors; see ContactScanner).
+CFEMAIL = "cfemail"
+MAILTO = "mailto"
+TEL = "tel"
+SOCIAL = "social"
+EMAIL = "email"
+PHONE = "phone"
+ALL_KINDS = (CFEMAIL, MAILTO, TEL, SOCIAL, EMAIL, PHONE)
+# Kinds whose value is an email address.
+EMAIL_KINDS = frozenset({CFEMAIL, MAILTO, EMAIL})
+
+# Patterns avoid lookarounds and backreferences so RE2 accepts them too.
+# Whitespace lists the no-break spaces (as literal characters) because
+# RE2's \s is ASCII only.
+_WS = "[\\s\u00a0\u2009\u202f]"
+_AT = (
+    "(?:@"
+    f"|{_WS}*\\[{_WS}*(?i:at){_WS}*\\]{_WS}*"
+    f"|{_WS}*\\({_WS}*(?i:at){_WS}*\\){_WS}*"
+    f"|{_WS}+(?i:at){_WS}+"
+    "|&#0*64;|&#[xX]0*40;|&commat;)"
+)
+_OBFUSCATED_DOT = (
+    f"(?:{_WS}*\\[{_WS}*(?i:dot){_WS}*\\]{_WS}*"
+    f"|{_WS}*\\({_WS}*(?i:dot){_WS}*\\){_WS}*"
+    f"|{_WS}+(?i:dot){_WS}+"
+    "|&#0*46;|&#[xX]0*2[eE];|&period;)"
+)
+_DOT = f"(?:\\.|{_OBFUSCATED_DOT})"
+_LOCAL_CHARS = "[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+"
+# Every _AT form contains an anchor found by email_anchors.at_anchors; the
+# email pattern is only matched where the local part before one starts.
+
+_ALTERNATIVES = {
+    # Cloudflare email protection: data-cfemail="<hex>" or .../email-protection#<hex>
+    CFEMAIL: "(?:data-cfemail=[\"']?|email-protection#)(?P<cfemail_hex>[0-9a-fA-F]{4,})",
+    MAILTO: "(?i:mailto:)(?P<mailto_address>[^\"'?&<>\\s]+)",
+    TEL: "(?i:tel:)(?P<tel_number>\\+?[0-9][0-9().\\-/ %]*[0-9])",
+    SOCIAL: None,  # built from utils.regex_patterns.SOCIAL_DOMAINS
+    EMAIL: (
+        f"(?P<email_local>{_LOCAL_CHARS}(?:{_OBFUSCATED_DOT}{_LOCAL_CHARS})*)"
+        f"{_AT}"
+        "(?P<email_domain>[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
+        f"(?:{_DOT}[a-zA-Z]{{2,63}})+)"
+    ),
+    # 6 to 15 digits; ends on a digit so no separator after it is consumed
+    PHONE: f"(?:\\+?[0-9]{{1,3}}(?:{_WS}|[\\-()])*)?(?:[0-9](?:{_WS}|[\\-()])*){{5,14}}[0-9]",
+}
+
+_OBFUSCATED_DOT_RE = re.compile(_OBFUSCATED_DOT)
+
+def _social_alternative(domains: Dict[str, List[str]]) -> str:
+    hosts = "|".join(
+        re.escape(domain) for platform_domains in domains.values() for domain in platform_domains
+    )
+    return f"(?i:https?://(?:[a-z0-9-]+\\.)*(?:{hosts})/[^\\s\"'<>()]+)"
+
+def social_platform(url: str) -> Optional[str]:
+    """Platform whose domain (or a subdomain of it) hosts url, if any."""
+    host = url.split("://", 1)[-1].split("/", 1)[0].lower()
+    for platform, domains in SOCIAL_DOMAINS.items():
+        for domain in domains:
+            if host == domain or host.endswith("." + domain):
+                return platform
+    return None
+
+def decode_cfemail(encoded: str) -> str:
+    """
+    Decode a Cloudflare-protected address: the first hex byte is the key
+    every following byte is XORed with. Returns "" on malformed input.
+    """
+    try:
+        key = int(encoded[:2], 16)
+        return bytes(
+            int(encoded[i : i + 2], 16) ^ key for i in range(2, len(encoded), 2)  # noqa: E203
+        ).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        logger.debug("Failed to decode Cloudflare email %s", encoded)
+        return ""
+
+_default_engine = "re"
+
+def select_engine(preferred: Optional[str] = None) -> str:
+    """
+    Resolve an engine name: 're' (standard library), 're2' (google-re2,
+    linear time on any input but slower per match on ordinary pages) or
+    'auto' (re2 when it is installed). None means the default engine.
+    """
+    engine = preferred or _default_engine
+    if engine == "auto":
+        return "re2" if importlib.util.find_spec("re2") is not None else "re"
+    return engine
+
+def set_default_engine(engine: Optional[str]) -> None:
+    """Engine for scanners built from now on (see select_engine), e.g. from config."""
+    global _default_engine
+    resolved = select_engine(engine or "re")
+    _engine_module(resolved)  # fail now, not on the first page
+    _default_engine = resolved
+    _scanners.clear()
+
+def _engine_module(engine: str) -> Any:
+    if engine == "re":
+        return re
+    if engine == "re2":
+        try:
+            return importlib.import_module("re2")
+        except ImportError as exc:  # noqa: BLE001
+            raise RuntimeError(
+                "The re2 scanner engine requires the 'google-re2' package. "
+                "Install it with `pip install google-re2`.",
+            ) from exc
+    raise ValueError(f"Unknown scanner engine {engine!r}; expected 're' or 're2'")
+
+@dataclass(frozen=True)
+class Hit:
+    kind: str
+    value: str
+    start: int
+    end: int
+
+def _overlaps(spans: List[Hit], starts: List[int], start: int, end: int) -> bool:
+    """Whether [start, end) overlaps one of spans (sorted, non-overlapping)."""
+    i = bisect.bisect_right(starts, start)
+    return (i > 0 and spans[i - 1].end > start) or (i < len(spans) and spans[i].start < end)
+
+class ContactScanner:
+    """
+    Finds every kind of contact in one left-to-right pass.
+
+    All kinds but EMAIL are alternatives of a single pattern with a named
+    group per kind, so the text is scanned once however many kinds are
+    wanted. At each position the alternatives are tried in ALL_KINDS order.
+
+    Emails are found around their '@' (or obfuscated "at") anchors instead:
+    the email pattern is only tried where the local part before each one
+    starts, within a bounded window, so text without anchors is never
+    searched for emails. A match is never
+    reported as two kinds: an email inside a mailto:, tel:, Cloudflare or
+    social hit is dropped, and so is a phone inside an email.
+
+    Hit values are decoded but not normalized: obfuscated emails
+    ("info [at] example [dot] com") are rewritten with '@' and '.',
+    Cloudflare hex is decoded and mailto: addresses are unquoted.
+    """
+
+    def __init__(self, kinds: Iterable[str] = ALL_KINDS, engine: Optional[str] = None) -> None:
+        wanted = set(kinds)
+        unknown = wanted.difference(ALL_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown hit kinds: {sorted(unknown)}")
+        self.kinds = tuple(kind for kind in ALL_KINDS if kind in wanted)
+        self.engine = select_engine(engine)
+        engine_module = _engine_module(self.engine)
+        alternatives = dict(_ALTERNATIVES, **{SOCIAL: _social_alternative(SOCIAL_DOMAINS)})
+        pattern = "|".join(
+            f"(?P<{kind}>{alternatives[kind]})" for kind in self.kinds if kind != EMAIL
+        )
+        self._regex = engine_module.compile(pattern) if pattern else None
+        self._email_regex = engine_module.compile(_ALTERNATIVES[EMAIL]) if EMAIL in wanted else None
+        if self._email_regex is not None:
+            # google-re2 matches only take group numbers
+            self._email_local = self._email_regex.groupindex["email_local"]
+            self._email_domain = self._email_regex.groupindex["email_domain"]
+
+    def _email_hit(self, match: Any) -> Hit:
+        local = _OBFUSCATED_DOT_RE.sub(".", match.group(self._email_local))
+        domain = _OBFUSCATED_DOT_RE.sub(".", match.group(self._email_domain))
+        return Hit(EMAIL, f"{local}@{domain}", match.start(), match.end())
+
+    def _hit(self, match: Any) -> Optional[Hit]:
+        kind = match.lastgroup
+        start, end = match.span()
+        if kind == CFEMAIL:
+            value = decode_cfemail(match.group("cfemail_hex"))
+            return Hit(CFEMAIL, value, start, end) if value else None
+        if kind == MAILTO:
+            return Hit(MAILTO, unquote(match.group("mailto_address")), start, end)
+        if kind == TEL:
+            return Hit(TEL, unquote(match.group("tel_number")), start, end)
+        return Hit(kind, match.group(kind), start, end)
+
+    def _scan_emails(self, text: str) -> List[Hit]:
+        anchors = at_anchors(text, obfuscated=True)
+        if not anchors:
+            return []
+        return [self._email_hit(m) for m in iter_anchored_matches(text, self._email_regex, anchors)]
+
+    def scan(self, text: str) -> List[Hit]:
+        """Hits in text, in the order they occur."""
+        hits = []
+        if self._regex is not None:
+            for match in self._regex.finditer(text):
+                hit = self._hit(match)
+                if hit is not None:
+                    hits.append(hit)
+        if self._email_regex is None:
+            return hits
+        emails = self._scan_emails(text)
+        if not emails:
+            return hits
+
+        claimed = [h for h in hits if h.kind != PHONE]
+        claimed_starts = [h.start for h in claimed]
+        emails = [e for e in emails if not _overlaps(claimed, claimed_starts, e.start, e.end)]
+        email_starts = [e.start for e in emails]
+        phones = [
+            h for h in hits
+            if h.kind == PHONE and not _overlaps(emails, email_starts, h.start, h.end)
+        ]
+        return sorted(claimed + phones + emails, key=lambda h: h.start)
+
+def emails_from_hits(hits: Iterable[Hit]) -> Set[str]:
+    """
+    Unique, lowercased addresses among hits. mailto: and Cloudflare values
+    are taken whole, so every value must be one complete address to count.
+    """
+    emails: Set[str] = set()
+    for hit in hits:
+        if hit.kind in EMAIL_KINDS:
+            email = hit.value.strip().strip(".,;").lower()
+            if EMAIL_REGEX.fullmatch(email):
+                emails.add(email)
+    return emails
+
+_scanners: Dict[tuple, ContactScanner] = {}
+
+def get_scanner(kinds: Iterable[str] = ALL_KINDS) -> ContactScanner:
+    """Shared scanner for kinds with the default engine, compiled on first use."""
+    key = tuple(sorted(set(kinds)))
+    scanner = _scanners.get(key)
+    if scanner is None:
+        scanner = _scanners[key] = ContactScanner(key)
+    return scanner
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from page_contacts import extract_page_contacts
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _SiteState:
+    pending: int = 0
+    submitted: int = 0
+    finished: bool = False
+    results: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def check_done(self) -> None:
+        if self.finished and not self.pending:
+            self.done.set()
+
+class ExtractionPipeline:
+    """
+    Extraction stage for pipelined crawls.
+
+    Fetchers push raw page bytes with submit(); a bounded asyncio queue feeds
+    a ProcessPoolExecutor running extract_page_contacts, so CPU-heavy parsing
+    runs on every core while the event loop keeps sockets busy. A full queue
+    blocks submit(), which slows fetchers down instead of buffering pages.
+    """
+
+    def __init__(
+        self,
+        regions: List[str] | None = None,
+        workers: Optional[int] = None,
+        queue_size: int = 256,
+    ) -> None:
+        self.regions = regions or []
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = max(1, queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self._sites: Dict[str, _SiteState] = {}
+
+    async def __aenter__(self) -> "ExtractionPipeline":
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # Twice as many consumers as processes keeps the next job ready
+        # whenever a worker frees up.
+        self._consumers = [
+            asyncio.create_task(self._consume()) for _ in range(self.workers * 2)
+        ]
+        logger.info("Extraction pipeline started with %d worker process(es).", self.workers)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _site(self, root_url: str) -> _SiteState:
+        state = self._sites.get(root_url)
+        if state is None:
+            state = _SiteState()
+            self._sites[root_url] = state
+        return state
+
+    async def submit(
+        self,
+        root_url: str,
+        page_url: str,
+        body: bytes,
+        encoding: Optional[str] = None,
+    ) -> None:
+        """Queue one fetched page for extraction (waits while the queue is full)."""
+        assert self._queue is not None, "ExtractionPipeline used outside 'async with'"
+        state = self._site(root_url)
+        index = state.submitted
+        state.submitted += 1
+        state.pending += 1
+        await self._queue.put((root_url, index, page_url, body, encoding))
+
+    async def collect(self, root_url: str) -> List[Dict[str, Any]]:
+        """
+        Mark a site as fully fetched and return per-page contacts, in fetch
+        order, once all of its pages have been extracted.
+        """
+        state = self._site(root_url)
+        state.finished = True
+        state.check_done()
+        await state.done.wait()
+        self._sites.pop(root_url, None)
+        return [contacts for _, contacts in sorted(state.results, key=lambda r: r[0])]
+
+    async def _consume(self) -> None:
+        assert self._queue is not None and self._executor is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            root_url, index, page_url, body, encoding = await self._queue.get()
+            state = self._site(root_url)
+            try:
+                contacts = await loop.run_in_executor(
+                    self._executor,
+                    extract_page_contacts,
+                    page_url,
+                    body,
+                    self.regions,
+                    encoding,
+                )
+                state.results.append((index, contacts))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Extraction failed for %s: %s", page_url, exc)
+            finally:
+                state.pending -= 1
+                state.check_done()
+                self._queue.task_done()
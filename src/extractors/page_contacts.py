@@ -0,0 +1,60 @@
+import logging
+from typing import Any, Dict, List
+
+from contact_scanner import EMAIL_KINDS, TEL, emails_from_hits, get_scanner
+from phone_parser import extract_phone_numbers, validate_phone_candidates
+from social_link_finder import extract_social_links
+from utils.page_document import PageDocument
+from utils_cleaner import html_to_text, normalize_phone, normalize_url
+
+logger = logging.getLogger(__name__)
+
+def extract_page_contacts(
+    page_url: str,
+    html: str | bytes | PageDocument,
+    regions: List[str] | None = None,
+    encoding: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Run every extractor over a single page.
+
+    Kept at module level with plain arguments and a plain dict result so it
+    can be shipped to ProcessPoolExecutor workers. Passing a PageDocument
+    reuses a parse tree the crawler already built.
+
+    Returns a dict with keys: 'url', 'emails', 'phones' and 'socials'
+    (a list of {'platform', 'url'} dicts).
+    """
+    if isinstance(html, bytes):
+        html = html.decode(encoding or "utf-8", errors="replace")
+
+    contacts: Dict[str, Any] = {"url": page_url, "emails": [], "phones": [], "socials": []}
+    doc = PageDocument.of(html, page_url)
+    if not doc.html:
+        return contacts
+
+    # One scan of the markup finds emails (plain, obfuscated, mailto: and
+    # Cloudflare-protected) and tel: links; phones are read from the
+    # visible text, where markup and scripts cannot fake them.
+    hits = get_scanner(EMAIL_KINDS | {TEL}).scan(doc.html)
+    text = html_to_text(doc)
+    emails = emails_from_hits(hits)
+    phones = extract_phone_numbers(text, regions)
+    phones.update(validate_phone_candidates((h.value for h in hits if h.kind == TEL), regions))
+    phones = {normalize_phone(p) for p in phones}
+
+    contacts["emails"] = [e for e in emails if e]
+    contacts["phones"] = [p for p in phones if p]
+    contacts["socials"] = [
+        {"platform": entry["platform"], "url": normalize_url(entry["url"])}
+        for entry in extract_social_links(doc)
+    ]
+
+    logger.debug(
+        "Page %s: %d emails, %d phones, %d social links",
+        page_url,
+        len(contacts["emails"]),
+        len(contacts["phones"]),
+        len(contacts["socials"]),
+    )
+    return contacts
@@ -4,21 +4,11 @@ from typing import Iterable, List, Set
 
 import phonenumbers
 
+from contact_scanner import PHONE, get_scanner
 from utils_cleaner import normalize_phone
 
 logger = logging.getLogger(__name__)
 
-# Rough candidate phone number pattern. Real validation is delegated to phonenumbers.
-PHONE_CANDIDATE_REGEX = re.compile(
-    r"""
-    (?:
-        \+?\d{1,3}[\s\-\(\)]*     # Country code (optional)
-    )?
-    (?:\d[\s\-\(\)]*){6,15}      # Main digits
-    """,
-    re.VERBOSE,
-)
-
 def _iter_phone_candidates(text: str | bytes | Iterable[str]) -> List[str]:
     if isinstance(text, bytes):
         source = text.decode("utf-8", errors="ignore")
@@ -27,7 +17,8 @@ def _iter_phone_candidates(text: str | bytes | Iterable[str]) -> List[str]:
     else:
         source = "\n".join(text)
 
-    candidates = [m.group(0) for m in PHONE_CANDIDATE_REGEX.finditer(source)]
+    # Rough candidates (contact_scanner.PHONE); real validation is delegated to phonenumbers.
+    candidates = [hit.value for hit in get_scanner((PHONE,)).scan(source)]
     logger.debug("Phone parser found %d candidate strings.", len(candidates))
     return candidates
 
@@ -42,8 +33,17 @@ def extract_phone_numbers(
     :param regions: List of ISO country codes to attempt parsing against.
                     Useful for DACH & Nordic or other regional formats.
     """
+    return validate_phone_candidates(_iter_phone_candidates(text), regions)
+
+def validate_phone_candidates(
+    candidates: Iterable[str],
+    regions: List[str] | None = None,
+) -> Set[str]:
+    """
+    Normalized E.164 numbers among candidate strings (e.g. scanner hits)
+    that phonenumbers accepts as valid for one of regions.
+    """
     regions = regions or ["US"]
-    candidates = _iter_phone_candidates(text)
     numbers: Set[str] = set()
 
     for candidate in candidates:
@@ -2,7 +2,7 @@ thonimport logging
 import re
 from typing import Iterable, List, Sequence, TypeVar
 
-from bs4 import BeautifulSoup
+from utils.page_document import PageDocument
 
 logger = logging.getLogger(__name__)
 
@@ -44,12 +44,9 @@ def normalize_url(url: str | None) -> str:
 
     return url
 
-def html_to_text(html_text: str) -> str:
-    soup = BeautifulSoup(html_text, "html.parser")
-    # Remove script and style to reduce noise
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    text = soup.get_text(separator=" ", strip=True)
+def html_to_text(html_text: str | PageDocument) -> str:
+    # Script, style and noscript content is left out to reduce noise
+    text = PageDocument.of(html_text).text
     logger.debug("Converted HTML to text of length %d.", len(text))
     return text
 
@@ -1,10 +1,17 @@
 thonimport argparse
+import asyncio
 import datetime as dt
+import functools
+import itertools
 import json
 import logging
+import multiprocessing
 import os
+import socket
 import sys
-from typing import Any, Dict, List, Set, Tuple
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 
 # Ensure submodule directories are importable when running as a script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,28 +22,48 @@ for subdir in ("extractors", "crawlers", "exporters"):
     if path not in sys.path:
         sys.path.append(path)
 
-from email_detector import extract_emails  # type: ignore
-from phone_parser import extract_phone_numbers  # type: ignore
-from social_link_finder import extract_social_links  # type: ignore
+from contact_scanner import set_default_engine  # type: ignore
+from page_contacts import extract_page_contacts  # type: ignore
+from extraction_pipeline import ExtractionPipeline  # type: ignore
 from utils_cleaner import (  # type: ignore
     deduplicate_preserve_order,
-    html_to_text,
-    normalize_email,
-    normalize_phone,
     normalize_url,
 )
 
 from static_crawler import StaticCrawler  # type: ignore
 from dynamic_crawler import DynamicCrawler  # type: ignore
+from async_crawler import AsyncCrawler  # type: ignore
 from json_exporter import export_to_json  # type: ignore  # noqa: E402
+from ndjson_exporter import NdjsonExporter, iter_ndjson_records  # type: ignore  # noqa: E402
+from exporter.output_formatter import write_csv  # noqa: E402
+from utils.dns_cache import DnsCache, filter_resolvable  # noqa: E402
+from utils.fetch_guard import FetchGuard  # noqa: E402
+from utils.http_cache import HttpCache  # noqa: E402
+from utils.input_reader import iter_input_urls  # noqa: E402
+from utils.proxy_pool import ProxyPool  # noqa: E402
+from utils.retry_policy import RetryPolicy  # noqa: E402
+from utils.run_journal import RunJournal  # noqa: E402
+from utils.saturation import SaturationPolicy  # noqa: E402
+from utils.site_discovery import SiteDiscovery  # noqa: E402
+from utils.transport import brotli_available, get_http_session, http2_available  # noqa: E402
+from utils.url_canonicalizer import site_host  # noqa: E402
+from utils.work_queue import LeaseKeeper, WorkQueue, open_work_queue  # noqa: E402
+from core.browser_pool import (  # noqa: E402
+    get_browser_pool,
+    get_render_profile,
+    is_playwright_available,
+)
 
 logger = logging.getLogger("deep_contact_scraper")
 
 def configure_logging(verbose: bool = False) -> None:
     level = logging.DEBUG if verbose else logging.INFO
+    # force: importing exporter.output_formatter already gave the root
+    # logger a handler (utils.logger), which would make this a no-op
     logging.basicConfig(
         level=level,
         format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+        force=True,
     )
 
 def resolve_path(path: str) -> str:
@@ -51,9 +78,68 @@ def load_config(config_path: str | None) -> Dict[str, Any]:
         "max_depth": 2,
         "max_pages_per_site": 15,
         "use_dynamic_crawler": False,
+        "use_async_crawler": False,
+        "use_adaptive_rendering": False,
         "dynamic_render_timeout": 15,
+        "render_concurrency": 4,
+        "render_profile": "lean",
         "concurrent_requests": 4,
+        "per_site_concurrency": 2,
+        "per_host_rate": 2.0,
+        "per_host_burst": 2,
+        "per_host_max_in_flight": 2,
+        "use_extraction_pipeline": False,
+        "extraction_workers": None,
+        "extraction_queue_size": 256,
+        "http_cache_path": None,
+        "http_cache_max_mb": 512,
+        "http_cache_ttl_hours": 720,
+        "http_cache_fresh_minutes": 0,
+        "stream_input": False,
+        "input_expected_urls": 1000000,
+        "input_dedupe_error_rate": 1e-6,
+        "journal_path": None,
+        "output_format": "json",
+        "ndjson_flush_every": 100,
+        "ndjson_flush_seconds": 1.0,
+        "ndjson_fsync": False,
+        "visited_set": "fingerprint",
+        "use_saturation": False,
+        "saturation_patience": 3,
+        "saturation_required": {"emails": 1, "phones": 1, "socials": 1},
+        "use_site_discovery": False,
+        "discovery_max_sitemaps": 5,
+        "discovery_max_seeds": 10,
+        "max_response_kb": 2048,
+        "allowed_content_types": ["text/html", "application/xhtml+xml"],
+        "use_http2": True,
+        "adaptive_timeouts": True,
+        "min_timeout": 3.0,
+        "retry_max_retries": 2,
+        "retry_base_delay": 0.5,
+        "retry_max_delay": 30.0,
+        "retry_budget_ratio": 0.1,
+        "use_dns_cache": False,
+        "dns_ttl_seconds": 300,
+        "dns_negative_ttl_seconds": 60,
+        "dns_timeout": 3.0,
+        "dns_prefetch_concurrency": 32,
+        "dns_nameservers": None,
+        "dns_report_path": None,
         "proxy": None,
+        "proxy_list": [],
+        "proxy_list_path": None,
+        "proxy_max_in_flight": 4,
+        "proxy_quarantine_seconds": 60,
+        "proxy_acquire_timeout": 60,
+        "queue_path": None,
+        "queue_lease_seconds": 300,
+        "queue_batch_size": 8,
+        "queue_max_attempts": 3,
+        "queue_poll_seconds": 5,
+        "shard_dir": None,
+        "workers": 1,
+        "scanner_engine": "re",
         "regions_for_phones": ["DE", "AT", "CH", "SE", "NO", "DK", "FI", "IS"],
     }
 
@@ -95,12 +181,70 @@ def read_input_urls(input_path: str) -> List[str]:
     logger.info("Loaded %d unique root URL(s) from %s", len(urls), path)
     return urls
 
+def stream_input_urls(input_path: str, config: Dict[str, Any]) -> Iterable[str]:
+    """
+    Lazily read normalized, de-duplicated root URLs for very large inputs.
+    Text, JSON array and gzip inputs are accepted; see utils.input_reader.
+    """
+    return iter_input_urls(
+        resolve_path(input_path),
+        normalize=normalize_url,
+        expected_urls=int(config.get("input_expected_urls", 1000000)),
+        error_rate=float(config.get("input_dedupe_error_rate", 1e-6)),
+    )
+
+def _adaptive_browser_pool(config: Dict[str, Any]) -> Any:
+    """Browser pool for adaptive rendering, or None if it is off or unavailable."""
+    if not config.get("use_adaptive_rendering"):
+        return None
+    if not is_playwright_available():
+        logger.warning("Adaptive rendering needs Playwright; continuing without rendering.")
+        return None
+    logger.info("Adaptive rendering enabled: JavaScript shells will be rendered.")
+    return get_browser_pool(
+        size=int(config.get("render_concurrency", 4)),
+        user_agent=config.get("user_agent"),
+        proxy=config.get("proxy"),
+        profile=get_render_profile(config.get("render_profile")),
+    )
+
+def _make_http_cache(config: Dict[str, Any]) -> HttpCache | None:
+    path = config.get("http_cache_path")
+    if not path:
+        return None
+    cache_path = resolve_path(path)
+    logger.info("Using HTTP cache at %s", cache_path)
+    return HttpCache.from_config({**config, "http_cache_path": cache_path})
+
+def _make_proxy_pool(config: Dict[str, Any]) -> ProxyPool | None:
+    path = config.get("proxy_list_path")
+    pool = ProxyPool.from_config(
+        {**config, "proxy_list_path": resolve_path(path) if path else None}
+    )
+    if pool is not None:
+        logger.info("Routing requests through a pool of %d proxies.", len(pool))
+    return pool
+
 def choose_crawler(config: Dict[str, Any]) -> Any:
     headers = {"User-Agent": config.get("user_agent")}
     timeout = int(config.get("timeout", 15))
     max_depth = int(config.get("max_depth", 2))
     max_pages = int(config.get("max_pages_per_site", 15))
     proxy = config.get("proxy")
+    render_timeout = int(config.get("dynamic_render_timeout", 15))
+    visited_set = config.get("visited_set", "fingerprint")
+    saturation = SaturationPolicy.from_config(config)
+    # One instance per run so robots.txt and sitemaps are fetched once per host
+    discovery = SiteDiscovery.from_config(config)
+    fetch_guard = FetchGuard.from_config(config)
+    retry = RetryPolicy.from_config(config, timeout=timeout)
+    proxy_pool = _make_proxy_pool(config)
+    concurrent_requests = int(config.get("concurrent_requests", 4))
+    logger.debug(
+        "Transport: HTTP/2 %s, brotli %s",
+        "available" if http2_available() else "unavailable (pip install h2)",
+        "available" if brotli_available() else "unavailable (pip install brotli)",
+    )
 
     if config.get("use_dynamic_crawler"):
         logger.info("Using dynamic crawler (JavaScript-capable).")
@@ -110,7 +254,40 @@ def choose_crawler(config: Dict[str, Any]) -> Any:
             max_depth=max_depth,
             max_pages_per_site=max_pages,
             proxy=proxy,
-            render_timeout=int(config.get("dynamic_render_timeout", 15)),
+            render_timeout=render_timeout,
+            render_concurrency=int(config.get("render_concurrency", 4)),
+            render_profile=config.get("render_profile", "lean"),
+            visited_set=visited_set,
+            saturation=saturation,
+            discovery=discovery,
+            fetch_guard=fetch_guard,
+        )
+
+    pool = _adaptive_browser_pool(config)
+    cache = _make_http_cache(config)
+
+    if config.get("use_async_crawler"):
+        logger.info("Using async crawler (concurrent HTML-only).")
+        return AsyncCrawler(
+            headers=headers,
+            timeout=timeout,
+            max_depth=max_depth,
+            max_pages_per_site=max_pages,
+            proxy=proxy,
+            concurrent_requests=concurrent_requests,
+            per_site_concurrency=int(config.get("per_site_concurrency", 2)),
+            per_host_rate=float(config.get("per_host_rate", 2.0)),
+            per_host_burst=float(config.get("per_host_burst", 2)),
+            per_host_max_in_flight=int(config.get("per_host_max_in_flight", 2)),
+            renderer=functools.partial(pool.render_async, timeout=render_timeout) if pool else None,
+            cache=cache,
+            visited_set=visited_set,
+            saturation=saturation,
+            discovery=discovery,
+            fetch_guard=fetch_guard,
+            http2=bool(config.get("use_http2", True)),
+            retry=retry,
+            proxy_pool=proxy_pool,
         )
 
     logger.info("Using static crawler (fast HTML-only).")
@@ -120,6 +297,15 @@ def choose_crawler(config: Dict[str, Any]) -> Any:
         max_depth=max_depth,
         max_pages_per_site=max_pages,
         proxy=proxy,
+        renderer=functools.partial(pool.render, timeout=render_timeout) if pool else None,
+        cache=cache,
+        visited_set=visited_set,
+        saturation=saturation,
+        discovery=discovery,
+        fetch_guard=fetch_guard,
+        session=get_http_session(pool_size=concurrent_requests),
+        retry=retry,
+        proxy_pool=proxy_pool,
     )
 
 def aggregate_contacts_for_site(
@@ -130,32 +316,38 @@ def aggregate_contacts_for_site(
     """
     Aggregate extracted contact info into one or more records for the given root_url.
     """
+    page_contacts = [
+        extract_page_contacts(
+            page.get("url", root_url),
+            page.get("document") or page.get("html", ""),
+            regions_for_phones,
+        )
+        for page in pages
+    ]
+    return build_site_records(root_url, page_contacts)
+
+def build_site_records(
+    root_url: str,
+    page_contacts: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Build output records from per-page contacts (see extract_page_contacts).
+    The first page a value was seen on becomes its sourcePage.
+    """
     email_sources: Dict[str, str] = {}
     phone_sources: Dict[str, str] = {}
     social_sources: Dict[str, Tuple[str, str]] = {}  # link -> (platform, page)
 
-    for page in pages:
-        page_url = page.get("url", root_url)
-        html = page.get("html", "")
-        if not html:
-            continue
-
-        text = html_to_text(html)
-        emails = {normalize_email(e) for e in extract_emails(html)}
-        phones = {
-            normalize_phone(p)
-            for p in extract_phone_numbers(text, regions_for_phones)
-        }
-
-        social_links = extract_social_links(html)
-        for email in emails:
+    for contacts in page_contacts:
+        page_url = contacts.get("url") or root_url
+        for email in contacts["emails"]:
             if email and email not in email_sources:
                 email_sources[email] = page_url
-        for phone in phones:
+        for phone in contacts["phones"]:
             if phone and phone not in phone_sources:
                 phone_sources[phone] = page_url
-        for entry in social_links:
-            link = normalize_url(entry["url"])
+        for entry in contacts["socials"]:
+            link = entry["url"]
             platform = entry["platform"]
             if link not in social_sources:
                 social_sources[link] = (platform, page_url)
@@ -248,16 +440,95 @@ def aggregate_contacts_for_site(
 
     return records
 
-def process_urls(
-    urls: List[str],
+def _log_site_records(root_url: str, site_records: List[Dict[str, Any]]) -> None:
+    if not site_records:
+        logger.info("No contact data found for %s", root_url)
+    else:
+        logger.info(
+            "Extracted %d contact record(s) from %s",
+            len(site_records),
+            root_url,
+        )
+
+# Receives (root_url, site_records) for every finished site.
+SiteSink = Callable[[str, List[Dict[str, Any]]], None]
+# Receives (root_url, reason) for every site dropped for good before crawling.
+SiteSkip = Callable[[str, str], None]
+# Crawls a batch of root URLs, handing each finished site to a SiteSink and
+# each dropped one to the SiteSkip, if given.
+SiteRunner = Callable[[Iterable[str], SiteSink, SiteSkip | None], None]
+
+def _progress(done: int, urls: Iterable[str]) -> str:
+    """'done/total', or just 'done' when the URLs are streamed."""
+    if isinstance(urls, list):
+        return f"{done}/{len(urls)}"
+    return str(done)
+
+async def _process_urls_async(
+    crawler: AsyncCrawler,
+    urls: Iterable[str],
+    regions: List[str],
+    on_site: SiteSink,
+) -> None:
+    done = 0
+    async for root_url, pages in crawler.crawl_many(urls):
+        done += 1
+        logger.info(
+            "(%s) Fetched %d page(s) for %s",
+            _progress(done, urls),
+            len(pages),
+            root_url,
+        )
+        site_records = aggregate_contacts_for_site(root_url, pages, regions)
+        _log_site_records(root_url, site_records)
+        on_site(root_url, site_records)
+
+async def _process_urls_pipelined(
+    crawler: AsyncCrawler,
+    urls: Iterable[str],
+    regions: List[str],
     config: Dict[str, Any],
-) -> List[Dict[str, Any]]:
-    crawler = choose_crawler(config)
-    all_records: List[Dict[str, Any]] = []
+    on_site: SiteSink,
+) -> None:
+    """
+    Like _process_urls_async, but pages are extracted in a process pool while
+    the crawler keeps fetching.
+    """
+    workers = config.get("extraction_workers")
+
+    done = 0
+    async with ExtractionPipeline(
+        regions=regions,
+        workers=int(workers) if workers else None,
+        queue_size=int(config.get("extraction_queue_size", 256)),
+    ) as pipeline:
+        async for root_url, pages in crawler.crawl_many(urls, on_page=pipeline.submit):
+            done += 1
+            logger.info(
+                "(%s) Fetched %d page(s) for %s",
+                _progress(done, urls),
+                len(pages),
+                root_url,
+            )
+            page_contacts = await pipeline.collect(root_url)
+            site_records = build_site_records(root_url, page_contacts)
+            _log_site_records(root_url, site_records)
+            on_site(root_url, site_records)
+
+def _process_sites(
+    crawler: Any, urls: Iterable[str], config: Dict[str, Any], on_site: SiteSink
+) -> None:
     regions = config.get("regions_for_phones") or []
 
+    if isinstance(crawler, AsyncCrawler):
+        if config.get("use_extraction_pipeline"):
+            asyncio.run(_process_urls_pipelined(crawler, urls, regions, config, on_site))
+        else:
+            asyncio.run(_process_urls_async(crawler, urls, regions, on_site))
+        return
+
     for idx, root_url in enumerate(urls, start=1):
-        logger.info("(%d/%d) Crawling %s", idx, len(urls), root_url)
+        logger.info("(%s) Crawling %s", _progress(idx, urls), root_url)
         try:
             pages = crawler.crawl(root_url)
             logger.info("Fetched %d page(s) for %s", len(pages), root_url)
@@ -266,17 +537,316 @@ def process_urls(
             continue
 
         site_records = aggregate_contacts_for_site(root_url, pages, regions)
-        if not site_records:
-            logger.info("No contact data found for %s", root_url)
+        _log_site_records(root_url, site_records)
+        on_site(root_url, site_records)
+
+def stream_urls(
+    urls: Iterable[str],
+    config: Dict[str, Any],
+    on_site: SiteSink,
+    journal: RunJournal | None = None,
+) -> None:
+    """
+    Crawl every root URL and hand each site's records to on_site as soon as
+    they are ready. With a journal, sites it already holds are skipped and
+    every finished site is journaled after on_site returns.
+    """
+    sink = on_site
+    if journal is not None:
+        if isinstance(urls, list):
+            pending = journal.pending(urls)
+            if len(pending) < len(urls):
+                logger.info(
+                    "Skipping %d site(s) already in the journal, %d left to crawl.",
+                    len(urls) - len(pending),
+                    len(pending),
+                )
+            urls = pending
         else:
-            logger.info(
-                "Extracted %d contact record(s) from %s",
-                len(site_records),
-                root_url,
-            )
-        all_records.extend(site_records)
+            urls = (url for url in urls if not journal.is_done(url))
+
+        def journaled(root_url: str, site_records: List[Dict[str, Any]]) -> None:
+            on_site(root_url, site_records)
+            journal.record(root_url, site_records)
+
+        sink = journaled
+
+    if isinstance(urls, list) and not urls:
+        return
+    site_runner(config)(urls, sink, None)
+
+def site_runner(config: Dict[str, Any]) -> SiteRunner:
+    """
+    Build the crawler (with its discovery, proxy pool and caches) and
+    install the DNS cache once; every batch passed to the returned function
+    reuses them, so robots.txt, proxy health and DNS answers carry over.
+    """
+    crawler = choose_crawler(config)
+    dns = DnsCache.from_config(config)
+    if dns is not None:
+        # Fetches reuse the pre-resolved answers through socket.getaddrinfo
+        dns.install()
+
+    def run(urls: Iterable[str], on_site: SiteSink, on_skip: SiteSkip | None) -> None:
+        if dns is not None:
+            urls = _drop_dead_domains(urls, dns, config, on_skip)
+        if isinstance(urls, list) and not urls:
+            return
+        _process_sites(crawler, urls, config, on_site)
+
+    return run
+
+def _drop_dead_domains(
+    urls: Iterable[str],
+    dns: DnsCache,
+    config: Dict[str, Any],
+    on_skip: SiteSkip | None = None,
+) -> Iterable[str]:
+    """Pre-resolve seed hosts; seeds on dead domains are logged and reported, not crawled."""
+    report_path = config.get("dns_report_path")
+
+    def on_dead(url: str, reason: str) -> None:
+        logger.warning("Dropping %s: DNS %s", url, reason)
+        if report_path:
+            with open(resolve_path(report_path), "a", encoding="utf-8") as f:
+                f.write(f"{url}\t{reason}\n")
+        if on_skip is not None:
+            on_skip(url, f"dns {reason}")
+
+    return filter_resolvable(
+        urls,
+        dns,
+        on_dead,
+        concurrency=int(config.get("dns_prefetch_concurrency", 32)),
+        timeout=float(config.get("dns_timeout", 3.0)),
+    )
+
+def process_urls(
+    urls: Iterable[str],
+    config: Dict[str, Any],
+    journal: RunJournal | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Crawl every root URL and return all contact records, including those of
+    sites the journal already held. urls is consumed lazily, so a streamed
+    input starts crawling before it has been read to the end.
+    """
+    if journal is None:
+        all_records: List[Dict[str, Any]] = []
+        stream_urls(urls, config, lambda _root, site_records: all_records.extend(site_records))
+        return all_records
+
+    # The journal keeps the records of every finished site, this run's and
+    # earlier ones', so they are read back from it rather than kept twice
+    if isinstance(urls, list):
+        seen = urls
+    else:
+        seen = []
+        urls = _remembering(urls, seen)
+    stream_urls(urls, config, lambda _root, _site_records: None, journal)
+    return journal.records_for(seen)
+
+def _remembering(urls: Iterable[str], seen: List[str]) -> Iterator[str]:
+    """Yield urls, appending each to seen as the crawl takes it."""
+    for url in urls:
+        seen.append(url)
+        yield url
+
+def _open_work_queue(config: Dict[str, Any]) -> WorkQueue:
+    uri = config.get("queue_path")
+    if not uri:
+        raise ValueError("Distributed mode needs queue_path (or --queue).")
+    if "://" not in uri:
+        uri = resolve_path(uri)
+    return open_work_queue(uri, max_attempts=int(config.get("queue_max_attempts", 3)))
+
+def run_coordinator(urls: Iterable[str], config: Dict[str, Any]) -> None:
+    """Seed the shared work queue; workers on any node then crawl from it."""
+    with _open_work_queue(config) as queue:
+        added = queue.enqueue(urls)
+        counts = queue.counts()
+    logger.info(
+        "Queued %d new site(s); %d pending, %d leased, %d done, %d failed.",
+        added,
+        counts["pending"],
+        counts["leased"],
+        counts["done"],
+        counts["failed"],
+    )
+
+def _ndjson_exporter(path: str, config: Dict[str, Any], append: bool) -> NdjsonExporter:
+    return NdjsonExporter(
+        path,
+        append=append,
+        flush_every=int(config.get("ndjson_flush_every", 100)),
+        flush_seconds=float(config.get("ndjson_flush_seconds", 1.0)),
+        fsync=bool(config.get("ndjson_fsync", False)),
+    )
+
+def _ndjson_sink(exporter: NdjsonExporter) -> SiteSink:
+    """
+    on_site for a journaled NDJSON run: the journal marks a site done as
+    soon as on_site returns, so its records are flushed (and fsynced, if
+    configured) first rather than on the exporter's periodic schedule.
+    """
+
+    def on_site(_root_url: str, site_records: List[Dict[str, Any]]) -> None:
+        exporter.write_records(site_records)
+        exporter.flush()
+
+    return on_site
 
-    return all_records
+def run_worker(config: Dict[str, Any], worker_id: str, shard_path: str) -> None:
+    """
+    Lease batches of sites from the work queue until it is drained, and
+    stream their records to this worker's NDJSON shard. Leases are renewed
+    in the background while a batch is crawled; a site is marked done only
+    after its records are flushed, or with its reason when it is dropped
+    for good (a dead domain). Only sites whose crawl failed are handed back
+    for another attempt. One crawler (see site_runner) serves every batch.
+    """
+    lease_seconds = float(config.get("queue_lease_seconds", 300))
+    batch_size = max(1, int(config.get("queue_batch_size", 8)))
+    poll_seconds = float(config.get("queue_poll_seconds", 5))
+    run_sites = site_runner(config)
+
+    with _open_work_queue(config) as queue, \
+            LeaseKeeper(queue, worker_id, lease_seconds) as keeper, \
+            _ndjson_exporter(shard_path, config, append=True) as exporter:
+        while True:
+            leases = queue.lease(worker_id, batch_size, lease_seconds)
+            if not leases:
+                counts = queue.counts()
+                if not counts["pending"] and not counts["leased"]:
+                    break
+                # Remaining sites are leased by other workers (or share a
+                # host with one); wait in case a lease expires.
+                time.sleep(poll_seconds)
+                continue
+
+            keeper.hold(lease.item_id for lease in leases)
+            open_leases = {lease.url: lease for lease in leases}
+
+            def on_site(root_url: str, site_records: List[Dict[str, Any]]) -> None:
+                exporter.write_records(site_records)
+                exporter.flush()
+                lease = open_leases.pop(root_url, None)
+                if lease is not None and not queue.complete(worker_id, lease.item_id):
+                    logger.warning("Lease on %s was lost before it finished.", root_url)
+
+            def on_skip(root_url: str, reason: str) -> None:
+                lease = open_leases.pop(root_url, None)
+                if lease is not None and not queue.complete(worker_id, lease.item_id, reason):
+                    logger.warning("Lease on %s was lost before it finished.", root_url)
+
+            run_sites([lease.url for lease in leases], on_site, on_skip)
+            keeper.hold([])
+            for url, lease in open_leases.items():
+                logger.warning("Returning %s to the queue (attempt %d failed).", url, lease.attempts)
+                queue.release(worker_id, lease.item_id, "crawl failed")
+
+    logger.info("Worker %s finished. Wrote %d record(s) to %s", worker_id, exporter.count, shard_path)
+
+def shard_index(url: str, workers: int) -> int:
+    """Worker for url. Hashing the host keeps all sites of a host on one worker."""
+    return zlib.crc32(site_host(url).encode("utf-8")) % workers
+
+def _run_shard(input_path: str, shard_path: str, config: Dict[str, Any], resume: bool, verbose: bool) -> None:
+    """Body of one --workers process: crawl its share of the sites into an NDJSON shard."""
+    configure_logging(verbose)
+    set_default_engine(config.get("scanner_engine"))
+    urls = read_input_urls(input_path)
+    with RunJournal(shard_path + ".journal", resume=resume, keep_records=False) as journal, \
+            _ndjson_exporter(shard_path, config, append=resume) as exporter:
+        stream_urls(urls, config, _ndjson_sink(exporter), journal)
+
+def run_sharded(
+    urls: Iterable[str],
+    config: Dict[str, Any],
+    shard_dir: str,
+    workers: int,
+    resume: bool = False,
+    verbose: bool = False,
+) -> List[str]:
+    """
+    Split the root URLs over workers processes by host (see shard_index)
+    and crawl each share in its own process, with its own crawler, journal
+    and NDJSON shard in shard_dir. Returns the shard paths; a worker that
+    exits with an error is logged and its partial shard kept.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    input_paths = [os.path.join(shard_dir, f"input-{i}.txt") for i in range(workers)]
+    counts = [0] * workers
+    files = [open(path, "w", encoding="utf-8") for path in input_paths]
+    try:
+        for url in urls:
+            index = shard_index(url, workers)
+            files[index].write(url + "\n")
+            counts[index] += 1
+    finally:
+        for f in files:
+            f.close()
+
+    shard_paths: List[str] = []
+    processes = []
+    for index, input_path in enumerate(input_paths):
+        if not counts[index]:
+            continue
+        shard_path = os.path.join(shard_dir, f"shard-{index}.ndjson")
+        shard_paths.append(shard_path)
+        process = multiprocessing.Process(
+            target=_run_shard,
+            args=(input_path, shard_path, config, resume, verbose),
+            name=f"shard-{index}",
+        )
+        process.start()
+        processes.append(process)
+    logger.info(
+        "Crawling with %d worker process(es); sites per worker: %s",
+        len(processes),
+        ", ".join(str(c) for c in counts if c),
+    )
+
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logger.error("Worker %s exited with code %s", process.name, process.exitcode)
+    return shard_paths
+
+def merge_shards(
+    shard_paths: Iterable[str],
+    output_path: str,
+    output_format: str,
+    urls: Iterable[str] | None = None,
+) -> int:
+    """
+    Merge NDJSON shards into one output, dropping records that repeat
+    another apart from their timestamp (a site crawled twice). Given the
+    list of root URLs, records are ordered as their sites are in it.
+    Returns the number of records written.
+    """
+    seen: Set[str] = set()
+    records: List[Dict[str, Any]] = []
+    for record in iter_ndjson_records(shard_paths):
+        key = json.dumps(
+            {k: v for k, v in record.items() if k != "timestamp"}, sort_keys=True, ensure_ascii=False
+        )
+        if key not in seen:
+            seen.add(key)
+            records.append(record)
+
+    if isinstance(urls, list):
+        order = {url: index for index, url in enumerate(urls)}
+        records.sort(key=lambda record: order.get(record.get("url"), len(order)))
+
+    if output_format == "csv":
+        write_csv(records, output_path)
+    elif output_format == "ndjson":
+        with _ndjson_exporter(output_path, {}, append=False) as exporter:
+            exporter.write_records(records)
+    else:
+        export_to_json(records, output_path)
+    return len(records)
 
 def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -294,6 +864,16 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
         default="data/output.json",
         help="Path where the JSON results will be written.",
     )
+    parser.add_argument(
+        "--stream-input",
+        action="store_true",
+        help="Read and de-duplicate input URLs lazily (large, JSON or gzip inputs).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson", "csv"),
+        help="Output format (overrides output_format). ndjson streams records as sites finish.",
+    )
     parser.add_argument(
         "--config",
         "-c",
@@ -316,6 +896,81 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Force use of static crawler (overrides config).",
     )
+    parser.add_argument(
+        "--use-async",
+        action="store_true",
+        help="Use the concurrent async crawler (honors concurrent_requests).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Async crawl with extraction in a process pool (implies --use-async).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip sites recorded in the run journal by an earlier, interrupted run.",
+    )
+    parser.add_argument(
+        "--saturate",
+        action="store_true",
+        help="Stop crawling a site once its contacts are saturated (see saturation_* settings).",
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="Seed crawls from robots.txt sitemaps and obey its Disallow rules.",
+    )
+    parser.add_argument(
+        "--dns-cache",
+        action="store_true",
+        help="Pre-resolve seed hosts, drop dead domains and cache DNS answers.",
+    )
+    parser.add_argument(
+        "--proxies",
+        metavar="PATH",
+        help="File with one proxy URL per line to rotate through (overrides proxy_list_path).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Crawl in N processes, sites split by host (0: one per CPU; overrides workers).",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Merge the NDJSON shards written by --worker processes into the output and exit.",
+    )
+    parser.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="Add the input URLs to the shared work queue and exit.",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Crawl sites leased from the shared work queue into a per-worker shard.",
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="PATH",
+        help="Work queue for --coordinator/--worker (overrides queue_path).",
+    )
+    parser.add_argument(
+        "--worker-id",
+        help="Name of this worker and its shard (default: <hostname>-<pid>).",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="Enable the on-disk HTTP cache at PATH (overrides http_cache_path).",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Render only pages that look like JavaScript shells (needs Playwright).",
+    )
     return parser.parse_args(argv)
 
 def main(argv: List[str] | None = None) -> None:
@@ -333,9 +988,62 @@ def main(argv: List[str] | None = None) -> None:
         config["use_dynamic_crawler"] = True
     elif args.use_static:
         config["use_dynamic_crawler"] = False
+        config["use_async_crawler"] = False
+
+    if args.pipeline:
+        config["use_extraction_pipeline"] = True
+    if args.adaptive:
+        config["use_adaptive_rendering"] = True
+    if args.cache:
+        config["http_cache_path"] = args.cache
+    if args.saturate:
+        config["use_saturation"] = True
+    if args.discover:
+        config["use_site_discovery"] = True
+    if args.dns_cache:
+        config["use_dns_cache"] = True
+    if args.proxies:
+        config["proxy_list_path"] = args.proxies
+    if args.queue:
+        config["queue_path"] = args.queue
+    if args.workers is not None:
+        config["workers"] = args.workers
+
+    if (args.use_async or args.pipeline) and not args.use_static:
+        config["use_async_crawler"] = True
+
+    # Before any extraction process is forked, so they inherit it
+    set_default_engine(config.get("scanner_engine"))
+
+    if args.stream_input:
+        config["stream_input"] = True
 
+    output_path = resolve_path(args.output)
+    shard_dir = resolve_path(config.get("shard_dir") or output_path + ".shards")
+    output_format = args.format or config.get("output_format", "json")
+
+    if args.worker:
+        os.makedirs(shard_dir, exist_ok=True)
+        worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        run_worker(config, worker_id, os.path.join(shard_dir, f"{worker_id}.ndjson"))
+        return
+
+    if args.merge:
+        shard_paths = sorted(
+            os.path.join(shard_dir, name) for name in os.listdir(shard_dir) if name.endswith(".ndjson")
+        )
+        count = merge_shards(shard_paths, output_path, output_format)
+        logger.info("Finished. Merged %d shard(s) into %d record(s) in %s", len(shard_paths), count, output_path)
+        return
+
+    urls: Iterable[str]
     try:
-        urls = read_input_urls(args.input)
+        if config.get("stream_input"):
+            url_iter = iter(stream_input_urls(args.input, config))
+            first = next(url_iter, None)
+            urls = itertools.chain([first], url_iter) if first else []
+        else:
+            urls = read_input_urls(args.input)
     except Exception as exc:  # noqa: BLE001
         logger.error("Failed to read input URLs: %s", exc)
         sys.exit(1)
@@ -344,11 +1052,41 @@ def main(argv: List[str] | None = None) -> None:
         logger.error("No URLs provided in the input file. Nothing to do.")
         sys.exit(1)
 
-    records = process_urls(urls, config)
+    if args.coordinator:
+        run_coordinator(urls, config)
+        return
 
-    output_path = resolve_path(args.output)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    export_to_json(records, output_path)
+    journal_path = resolve_path(config.get("journal_path") or output_path + ".journal")
+
+    workers = int(config.get("workers", 1))
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1:
+        shard_paths = run_sharded(urls, config, shard_dir, workers, resume=args.resume, verbose=args.verbose)
+        count = merge_shards(shard_paths, output_path, output_format, urls)
+        logger.info("Finished. Wrote %d record(s) to %s", count, output_path)
+        return
+
+    if output_format == "ndjson":
+        # Records already streamed to the output file need not be kept by
+        # the journal; on resume the file is appended to.
+        with RunJournal(journal_path, resume=args.resume, keep_records=False) as journal, \
+                _ndjson_exporter(output_path, config, append=args.resume) as exporter:
+            stream_urls(urls, config, _ndjson_sink(exporter), journal)
+        logger.info("Finished. Streamed %d record(s) to %s", exporter.count, output_path)
+        return
+
+    with RunJournal(journal_path, resume=args.resume) as journal:
+        records = process_urls(urls, config, journal)
+
+    if output_format == "csv":
+        write_csv(records, output_path)
+    else:
+        export_to_json(records, output_path)
+    # The output holds every site now; the journal only matters to resume
+    # a run that did not get this far
+    os.remove(journal_path)
     logger.info("Finished. Wrote %d record(s) to %s", len(records), output_path)
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import List
+
+# Hash probes per item. The optimal count for small error rates is ~20, but
+# every probe is a Python-level operation; eight probes with a somewhat
+# larger bit array is much faster at the same error rate.
+MAX_HASHES = 8
+
+class _Filter:
+    __slots__ = ("capacity", "num_bits", "num_hashes", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        optimal_hashes = max(1, round(-math.log2(error_rate)))
+        self.num_hashes = min(MAX_HASHES, optimal_hashes)
+        per_probe = 1 - error_rate ** (1 / self.num_hashes)
+        self.num_bits = max(64, math.ceil(-self.num_hashes * capacity / math.log(per_probe)))
+        self.capacity = capacity
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, h1: int, h2: int) -> List[int]:
+        # Enhanced double hashing: plain h1 + i*h2 collapses onto one bit
+        # whenever h2 is a multiple of m, which small filters hit often.
+        m = self.num_bits
+        x, y = h1 % m, h2 % m
+        out = []
+        for i in range(self.num_hashes):
+            out.append(x)
+            x = (x + y) % m
+            y = (y + i + 1) % m
+        return out
+
+    def contains(self, h1: int, h2: int) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self.positions(h1, h2))
+
+    def add(self, h1: int, h2: int) -> None:
+        bits = self.bits
+        for p in self.positions(h1, h2):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+class BloomFilter:
+    """
+    Scalable Bloom filter for de-duplicating very large string streams in
+    bounded memory (about 5 bytes per item at the default error rate).
+
+    When the expected capacity is exceeded a new, twice as large filter with
+    a tighter error rate is stacked on top, so the overall false positive
+    rate stays below error_rate however many items arrive. A false positive
+    means an unseen item is reported as seen.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-6) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.error_rate = error_rate
+        # Geometric error budget: sum over filters stays below error_rate.
+        self._next_error = error_rate / 2
+        self._filters = [_Filter(max(1, capacity), self._next_error)]
+        self.count = 0
+
+    @staticmethod
+    def _hashes(item: str) -> tuple[int, int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = self._hashes(item)
+        return any(f.contains(h1, h2) for f in self._filters)
+
+    def add(self, item: str) -> bool:
+        """Add item; return False if it was (probably) already present."""
+        h1, h2 = self._hashes(item)
+        if any(f.contains(h1, h2) for f in self._filters):
+            return False
+        current = self._filters[-1]
+        if current.count >= current.capacity:
+            self._next_error /= 2
+            current = _Filter(current.capacity * 2, self._next_error)
+            self._filters.append(current)
+        current.add(h1, h2)
+        self.count += 1
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(f.bits) for f in self._filters)
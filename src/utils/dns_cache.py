@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import ipaddress
+import itertools
+import logging
+import math
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Failure reasons recorded for hosts that do not resolve.
+NXDOMAIN = "nxdomain"
+NO_ADDRESS = "no_address"
+TIMEOUT = "timeout"
+TEMPORARY_FAILURE = "temporary_failure"
+# Seeds with these outcomes are dropped before crawling. Anything else,
+# timeouts included, may succeed on a later attempt: those seeds are still
+# crawled and the failure is not cached.
+DEAD_REASONS = frozenset({NXDOMAIN, NO_ADDRESS})
+
+# The real resolver, kept before install() replaces socket.getaddrinfo.
+_system_getaddrinfo = socket.getaddrinfo
+
+class DnsError(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+# resolver(host) -> (addresses, TTL in seconds or None when unknown);
+# raises DnsError on failure.
+Resolver = Callable[[str], Tuple[List[str], Optional[float]]]
+
+def system_resolver(host: str) -> Tuple[List[str], Optional[float]]:
+    """Resolve through the OS (getaddrinfo), which does not report TTLs."""
+    try:
+        infos = _system_getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+    except socket.gaierror as exc:
+        if exc.errno == socket.EAI_NONAME:
+            raise DnsError(NXDOMAIN) from exc
+        if exc.errno == getattr(socket, "EAI_NODATA", None):
+            raise DnsError(NO_ADDRESS) from exc
+        raise DnsError(TEMPORARY_FAILURE) from exc
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    if not addresses:
+        raise DnsError(NO_ADDRESS)
+    return addresses, None
+
+def dnspython_resolver(nameservers: Optional[Sequence[str]] = None, timeout: float = 3.0) -> Resolver:
+    """
+    Resolver built on dnspython, which reports record TTLs. nameservers
+    ('ip' or 'ip:port', e.g. a local stub resolver) replace the system ones.
+    """
+    try:
+        import dns.exception  # type: ignore
+        import dns.resolver  # type: ignore
+    except ImportError as exc:  # noqa: BLE001
+        raise RuntimeError(
+            "Custom DNS nameservers require the 'dnspython' package. "
+            "Install it with `pip install dnspython`.",
+        ) from exc
+
+    resolver = dns.resolver.Resolver(configure=not nameservers)
+    if nameservers:
+        resolver.nameservers = []
+        for server in nameservers:
+            address, _, port = server.rpartition(":") if server.count(":") == 1 else (server, "", "")
+            resolver.nameservers.append(address)
+            if port:
+                resolver.nameserver_ports[address] = int(port)
+    resolver.lifetime = timeout
+
+    def resolve(host: str) -> Tuple[List[str], Optional[float]]:
+        addresses: List[str] = []
+        ttl: Optional[float] = None
+        for rdtype in ("A", "AAAA"):
+            try:
+                answer = resolver.resolve(host, rdtype)
+            except dns.resolver.NXDOMAIN as exc:
+                raise DnsError(NXDOMAIN) from exc
+            except dns.resolver.NoAnswer:
+                continue
+            except dns.exception.Timeout as exc:
+                raise DnsError(TIMEOUT) from exc
+            except dns.exception.DNSException as exc:
+                raise DnsError(TEMPORARY_FAILURE) from exc
+            addresses.extend(record.to_text() for record in answer)
+            ttl = answer.rrset.ttl if ttl is None else min(ttl, answer.rrset.ttl)
+        if not addresses:
+            raise DnsError(NO_ADDRESS)
+        return addresses, ttl
+
+    return resolve
+
+@dataclass
+class DnsResult:
+    host: str
+    addresses: List[str] = field(default_factory=list)
+    reason: Optional[str] = None
+    expires: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.reason is None
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+class DnsCache:
+    """
+    In-process DNS cache.
+
+    - Answers are kept for their record TTL (clamped to [min_ttl, ttl]; ttl
+      is used as is when the resolver reports none), dead domains
+      (DEAD_REASONS) for negative_ttl. Transient failures are not kept.
+    - prefetch() resolves many hosts concurrently, e.g. every seed host
+      before the crawl starts.
+    - install() routes socket.getaddrinfo, and thus requests and httpx,
+      through the cache.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Resolver] = None,
+        ttl: float = 300.0,
+        negative_ttl: float = 60.0,
+        min_ttl: float = 30.0,
+        max_entries: int = 100000,
+    ) -> None:
+        self.resolver = resolver or system_resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min(min_ttl, ttl)
+        self.max_entries = max_entries
+        self._entries: Dict[str, DnsResult] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> Optional["DnsCache"]:
+        """Cache from the dns_* settings, or None when it is disabled."""
+        if not config.get("use_dns_cache"):
+            return None
+        nameservers = config.get("dns_nameservers")
+        resolver = None
+        if nameservers:
+            resolver = dnspython_resolver(nameservers, float(config.get("dns_timeout", 3.0)))
+        return cls(
+            resolver=resolver,
+            ttl=float(config.get("dns_ttl_seconds", 300)),
+            negative_ttl=float(config.get("dns_negative_ttl_seconds", 60)),
+        )
+
+    # ------- Lookups -------
+
+    def _lookup(self, host: str) -> DnsResult:
+        try:
+            addresses, ttl = self.resolver(host)
+        except DnsError as exc:
+            return DnsResult(host, reason=exc.reason, expires=time.monotonic() + self.negative_ttl)
+        ttl = self.ttl if ttl is None else min(max(ttl, self.min_ttl), self.ttl)
+        return DnsResult(host, addresses=list(addresses), expires=time.monotonic() + ttl)
+
+    def cached(self, host: str) -> Optional[DnsResult]:
+        host = host.lower().rstrip(".")
+        with self._lock:
+            result = self._entries.get(host)
+        if result is not None and result.expires > time.monotonic():
+            return result
+        return None
+
+    def resolve(self, host: str) -> DnsResult:
+        host = host.lower().rstrip(".")
+        result = self.cached(host)
+        if result is not None:
+            return result
+        result = self._lookup(host)
+        if not result.ok and result.reason not in DEAD_REASONS:
+            return result
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                for name in [n for n, r in self._entries.items() if r.expires <= now]:
+                    del self._entries[name]
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[host] = result
+        return result
+
+    def prefetch(
+        self, hosts: Iterable[str], concurrency: int = 32, timeout: float = 5.0
+    ) -> Dict[str, DnsResult]:
+        """
+        Resolve hosts concurrently. A host still unanswered after roughly
+        timeout seconds of its own is reported as TIMEOUT (and not cached);
+        lookups not yet started by then are cancelled.
+        """
+        todo = [h for h in dict.fromkeys(h.lower().rstrip(".") for h in hosts) if h and not _is_ip(h)]
+        results: Dict[str, DnsResult] = {}
+        if not todo:
+            return results
+        workers = max(1, min(concurrency, len(todo)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dns")
+        try:
+            futures = {executor.submit(self.resolve, host): host for host in todo}
+            done, _ = wait(futures, timeout=timeout * math.ceil(len(todo) / workers))
+            for future, host in futures.items():
+                if future in done:
+                    results[host] = future.result()
+                else:
+                    future.cancel()
+                    results[host] = DnsResult(host, reason=TIMEOUT)
+        finally:
+            # A lookup already running cannot be interrupted; its thread
+            # ends when the resolver itself gives up
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    # ------- socket integration -------
+
+    def getaddrinfo(self, host: Any, port: Any, family: int = 0, type: int = 0, proto: int = 0, flags: int = 0):  # noqa: A002
+        """Drop-in for socket.getaddrinfo answering from the cache."""
+        name = host.decode("idna") if isinstance(host, bytes) else host
+        if not name or _is_ip(name) or flags & socket.AI_NUMERICHOST:
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+        result = self.resolve(name)
+        if not result.ok:
+            raise socket.gaierror(socket.EAI_NONAME, f"{name}: {result.reason}")
+        infos = []
+        for address in result.addresses:
+            try:
+                infos.extend(
+                    _system_getaddrinfo(address, port, family, type, proto, flags | socket.AI_NUMERICHOST)
+                )
+            except socket.gaierror:
+                continue  # address family not wanted by this caller
+        if not infos:
+            raise socket.gaierror(socket.EAI_NONAME, f"{name}: {NO_ADDRESS}")
+        return infos
+
+    def install(self) -> None:
+        socket.getaddrinfo = self.getaddrinfo  # type: ignore[assignment]
+
+    @staticmethod
+    def uninstall() -> None:
+        socket.getaddrinfo = _system_getaddrinfo
+
+def url_host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+def filter_resolvable(
+    urls: Iterable[str],
+    dns: DnsCache,
+    on_dead: Callable[[str, str], None],
+    window: int = 512,
+    concurrency: int = 32,
+    timeout: float = 5.0,
+) -> Iterable[str]:
+    """
+    Pre-resolve the hosts of urls and drop those whose host is dead
+    (DEAD_REASONS), calling on_dead(url, reason) for each. Lists are
+    resolved in one pass and returned as a list; other iterables are
+    resolved window URLs at a time and filtered lazily.
+    """
+
+    def keep(batch: List[str]) -> List[str]:
+        results = dns.prefetch((url_host(u) for u in batch), concurrency, timeout)
+        alive = []
+        for url in batch:
+            result = results.get(url_host(url))
+            if result is not None and result.reason in DEAD_REASONS:
+                on_dead(url, result.reason)
+            else:
+                alive.append(url)
+        return alive
+
+    if isinstance(urls, list):
+        return keep(urls)
+
+    def lazily() -> Iterator[str]:
+        url_iter = iter(urls)
+        while True:
+            batch = list(itertools.islice(url_iter, window))
+            if not batch:
+                return
+            yield from keep(batch)
+
+    return lazily()
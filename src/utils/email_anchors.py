@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from typing import Iterator, List, Match, Pattern, Tuple
+
+# How far an email may reach around its '@'. RFC 5321 caps the local part
+# at 64 characters and the domain at 253; obfuscated forms ("first dot
+# last") are longer, so both windows leave room.
+LOCAL_WINDOW = 256
+DOMAIN_WINDOW = 256
+
+LOCAL_PART_CHARS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.!#$%&'*+/=?^_`{|}~-"
+)
+
+# Spellings of "at" in obfuscated addresses: "[at]", "(at)" and " at ",
+# in any case and with any whitespace around the word.
+_AT_WORDS = ("at", "AT", "At", "aT")
+_BEFORE_AT_WORD = frozenset("[(")
+_AFTER_AT_WORD = frozenset("])")
+# '@' as an HTML entity: &#64;, &#064;, &#x40; or &commat;
+_ENTITY_AT = re.compile(r"&#(?:0*64|[xX]0*40);")
+_OBFUSCATED_DOTS = r"\s*[\[(]\s*(?i:dot)\s*[\])]\s*|\s+(?i:dot)\s+|&#0*46;|&#[xX]0*2[eE];|&period;"
+# An obfuscated dot ending right where a local-part run starts, as in
+# "first dot last at example dot com", and the characters it can end on
+_OBFUSCATED_DOT_TAIL = re.compile(f"(?:{_OBFUSCATED_DOTS})$")
+_OBFUSCATED_DOT_ENDS = frozenset(";])")
+# What follows an anchor of a real address: a domain label, then a dot.
+# Checked first, as most "at" words in prose fail it ("at the office").
+_DOMAIN_AHEAD = re.compile(f"[\\s\\])]*[a-zA-Z0-9][a-zA-Z0-9-]*(?:\\.|{_OBFUSCATED_DOTS})")
+
+# (start, end) of an anchor; start is where the local part before it ends.
+Anchor = Tuple[int, int]
+
+def _char_anchors(text: str, needle: str) -> List[Anchor]:
+    anchors = []
+    i = text.find(needle)
+    while i != -1:
+        anchors.append((i, i + len(needle)))
+        i = text.find(needle, i + 1)
+    return anchors
+
+def _at_word_anchors(text: str) -> List[Anchor]:
+    anchors = []
+    end = len(text)
+    for word in _AT_WORDS:
+        i = text.find(word, 1)
+        while i != -1:
+            before = text[i - 1]
+            after = text[i + 2] if i + 2 < end else ""
+            if (before.isspace() or before in _BEFORE_AT_WORD) and (
+                after.isspace() or after in _AFTER_AT_WORD
+            ):
+                start = i - 1
+                while start > 0 and (text[start - 1].isspace() or text[start - 1] in _BEFORE_AT_WORD):
+                    start -= 1
+                anchors.append((start, i + 2))
+            i = text.find(word, i + 2)
+    return anchors
+
+def _entity_anchors(text: str) -> List[Anchor]:
+    anchors = _char_anchors(text, "&commat;")
+    i = text.find("&#")
+    while i != -1:
+        match = _ENTITY_AT.match(text, i)
+        if match:
+            anchors.append(match.span())
+        i = text.find("&#", i + 2)
+    return anchors
+
+def at_anchors(text: str, obfuscated: bool = False) -> List[Anchor]:
+    """
+    Spans of every '@' in text, in order, found by plain substring search.
+    With obfuscated=True also of '@' entities and of the word "at" between
+    brackets or whitespace, as in "info [at] example.com". Text without
+    anchors cannot contain an email.
+    """
+    anchors = _char_anchors(text, "@")
+    if obfuscated:
+        anchors.extend(_at_word_anchors(text))
+        anchors.extend(_entity_anchors(text))
+        anchors.sort()
+    return anchors
+
+def _local_starts(text: str, end: int, floor: int) -> List[int]:
+    """
+    Where the local part ending at end may start: the start of the run of
+    local-part characters before end, then, for each obfuscated dot before
+    that, the start of the run before the dot.
+    """
+    starts: List[int] = []
+    while True:
+        start = end
+        while start > floor and text[start - 1] in LOCAL_PART_CHARS:
+            start -= 1
+        if start == end:
+            return starts
+        starts.append(start)
+        if not (text[start - 1].isspace() or text[start - 1] in _OBFUSCATED_DOT_ENDS):
+            return starts
+        dot = _OBFUSCATED_DOT_TAIL.search(text, max(floor, start - 32), start)
+        if dot is None:
+            return starts
+        end = dot.start()
+
+def iter_anchored_matches(
+    text: str,
+    pattern: Pattern[str],
+    anchors: List[Anchor],
+    before: int = LOCAL_WINDOW,
+    after: int = DOMAIN_WINDOW,
+) -> Iterator[Match[str]]:
+    """
+    Matches of an email pattern in text, tried only where the local part
+    before an anchor starts (at most before characters back) and bounded
+    to after characters past the anchor, instead of at every position.
+    Matches contain their anchor and do not overlap.
+    """
+    resume = 0  # end of the last match; anchors before it are inside it
+    for start, end in anchors:
+        if start < resume or not _DOMAIN_AHEAD.match(text, end):
+            continue
+        window_end = min(len(text), end + after)
+        # Longest (most obfuscated) local part first
+        for local_start in reversed(_local_starts(text, start, max(resume, start - before))):
+            match = pattern.match(text, local_start, window_end)
+            if match is not None and match.end() > start:
+                yield match
+                resume = match.end()
+                break
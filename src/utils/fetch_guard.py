@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncIterable, Callable, Iterable, Mapping, Optional, Sequence
+from urllib.parse import unquote, urljoin, urlsplit
+
+from utils.frontier import ASSET_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALLOWED_TYPES = ("text/html", "application/xhtml+xml")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Links that are never worth downloading for contact extraction
+SKIPPED_EXTENSIONS = ASSET_EXTENSIONS + (
+    ".ico", ".bmp", ".tif", ".tiff", ".avi", ".mov", ".wmv", ".wav", ".ogg",
+    ".woff", ".woff2", ".ttf", ".eot", ".ppt", ".pptx", ".odt", ".rar", ".7z",
+    ".gz", ".tgz", ".tar", ".exe", ".dmg", ".iso", ".apk",
+)
+TRUNCATION_MARKER = b"\n<!-- truncated -->\n"
+# Crawlers follow redirects themselves so every hop is checked
+MAX_REDIRECTS = 10
+
+class UnwantedContent(Exception):
+    """A response skipped by URL or headers before its body was downloaded."""
+
+def decode_body(body: bytes, encoding: Optional[str]) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+class _CappedBody:
+    """
+    Accumulates streamed chunks, keeping at most max_bytes: the head of the
+    body plus a rolling window over its tail, where footers (and their
+    contact details) live.
+    """
+
+    def __init__(self, max_bytes: int, tail_bytes: int) -> None:
+        self.head_limit = max_bytes - tail_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.tail_bytes:
+            self.tail += chunk
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[: len(self.tail) - self.tail_bytes]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def result(self) -> bytes:
+        if self.truncated:
+            return bytes(self.head) + TRUNCATION_MARKER + bytes(self.tail)
+        return bytes(self.head + self.tail)
+
+class FetchGuard:
+    """
+    Checks applied to a streamed download before and while its body arrives.
+
+    - URLs ending in a binary/document extension are rejected unfetched.
+    - Responses whose Content-Type is not one of allowed_types are rejected
+      after the headers; a missing Content-Type is let through.
+    - Bodies over max_bytes keep their first bytes and their last
+      tail_fraction * max_bytes bytes. Reading stops at max_download_bytes,
+      in which case the tail is the last window read. max_bytes=0 disables
+      the cap.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        allowed_types: Sequence[str] = DEFAULT_ALLOWED_TYPES,
+        tail_fraction: float = 0.25,
+        max_download_bytes: Optional[int] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.allowed_types = tuple(t.lower() for t in allowed_types)
+        self.tail_bytes = int(max_bytes * tail_fraction)
+        self.max_download_bytes = max_download_bytes or max_bytes * 8
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "FetchGuard":
+        return cls(
+            max_bytes=int(config.get("max_response_kb", 2048)) * 1024,
+            allowed_types=config.get("allowed_content_types") or DEFAULT_ALLOWED_TYPES,
+        )
+
+    def check_url(self, url: str) -> None:
+        path = unquote(urlsplit(url).path).lower()
+        if path.endswith(SKIPPED_EXTENSIONS):
+            raise UnwantedContent(f"{url}: skipped file type")
+
+    def check_redirect(
+        self, url: str, location: str, allowed: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Absolute target of a redirect from url, checked like a link before
+        it is followed: by URL, and by allowed (robots.txt) when given.
+        """
+        target = urljoin(url, location)
+        self.check_url(target)
+        if allowed is not None and not allowed(target):
+            raise UnwantedContent(f"{url}: redirects to {target}, disallowed by robots.txt")
+        return target
+
+    def check_headers(self, url: str, headers: Mapping[str, str]) -> None:
+        content_type = (headers.get("Content-Type") or "").lower()
+        if content_type and not any(t in content_type for t in self.allowed_types):
+            raise UnwantedContent(f"{url}: unsupported content-type {content_type}")
+
+    def _new_body(self) -> Optional[_CappedBody]:
+        return _CappedBody(self.max_bytes, self.tail_bytes) if self.max_bytes else None
+
+    def _done(self, url: str, capped: _CappedBody) -> bytes:
+        if capped.truncated:
+            logger.debug("Truncated %s from %d to %d bytes", url, capped.total, self.max_bytes)
+        return capped.result()
+
+    def read(self, url: str, chunks: Iterable[bytes]) -> bytes:
+        capped = self._new_body()
+        if capped is None:
+            return b"".join(chunks)
+        for chunk in chunks:
+            capped.feed(chunk)
+            if capped.total >= self.max_download_bytes:
+                break
+        return self._done(url, capped)
+
+    async def read_async(self, url: str, chunks: AsyncIterable[bytes]) -> bytes:
+        capped = self._new_body()
+        if capped is None:
+            return b"".join([chunk async for chunk in chunks])
+        async for chunk in chunks:
+            capped.feed(chunk)
+            if capped.total >= self.max_download_bytes:
+                break
+        return self._done(url, capped)
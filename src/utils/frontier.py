@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from utils.regex_patterns import CONTACT_PAGE_KEYWORDS
+from utils.url_canonicalizer import canonicalize_url
+from utils.url_fingerprint import UrlFrontier
+
+# Pages that almost always carry contact details (legal notice, contact
+# forms); crawlers fetch these first
+PRIORITY_KEYWORDS = (
+    "impressum",
+    "imprint",
+    "kontakt",
+    "contact",
+    "legal-notice",
+    "yhteystiedot",
+    "hafa-samband",
+)
+
+# Weights for a keyword found in the URL path / in the anchor text.
+PRIORITY_PATH_WEIGHT = 10.0
+PRIORITY_TEXT_WEIGHT = 8.0
+CONTACT_PATH_WEIGHT = 3.0
+CONTACT_TEXT_WEIGHT = 2.0
+DEPTH_PENALTY = 2.0
+SEGMENT_PENALTY = 0.5
+# Links to documents and media are fetched last, if at all.
+ASSET_PENALTY = 20.0
+ASSET_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip",
+    ".mp4", ".mp3", ".doc", ".docx", ".xls", ".xlsx", ".css", ".js",
+)
+
+_SECONDARY_KEYWORDS = [kw for kw in CONTACT_PAGE_KEYWORDS if kw not in PRIORITY_KEYWORDS]
+
+_ANCHOR = re.compile(r"<a\b([^>]*)>(.*?)</a\s*>", re.IGNORECASE | re.DOTALL)
+_HREF_ATTR = re.compile(r"""href\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+_SKIPPED_PREFIXES = ("#", "mailto:", "tel:", "javascript:")
+
+def score_link(url: str, text: str = "", depth: int = 0) -> float:
+    """
+    How likely a link is to lead to contact details; higher is better.
+
+    Keywords from PRIORITY_KEYWORDS (Impressum, Kontakt, ...) dominate,
+    CONTACT_PAGE_KEYWORDS (about, team, ...) add less, and deeper or longer
+    paths and asset links score lower.
+    """
+    path = unquote(urlsplit(url).path).lower()
+    text = text.lower()
+    score = 0.0
+    for keyword in PRIORITY_KEYWORDS:
+        if keyword in path:
+            score += PRIORITY_PATH_WEIGHT
+        if keyword in text:
+            score += PRIORITY_TEXT_WEIGHT
+    for keyword in _SECONDARY_KEYWORDS:
+        if keyword in path:
+            score += CONTACT_PATH_WEIGHT
+        if keyword in text:
+            score += CONTACT_TEXT_WEIGHT
+    if path.endswith(ASSET_EXTENSIONS):
+        score -= ASSET_PENALTY
+    score -= depth * DEPTH_PENALTY
+    score -= path.rstrip("/").count("/") * SEGMENT_PENALTY
+    return score
+
+def extract_anchor_links(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """
+    Regex-based (canonical URL, anchor text) pairs for pages that are not
+    parsed into a PageDocument. Bare href attributes outside <a> tags are
+    not picked up.
+    """
+    links: List[Tuple[str, str]] = []
+    for match in _ANCHOR.finditer(html):
+        href_match = _HREF_ATTR.search(match.group(1))
+        if not href_match:
+            continue
+        href = href_match.group(1).strip()
+        if not href or href.lower().startswith(_SKIPPED_PREFIXES):
+            continue
+        text = " ".join(_TAG.sub(" ", match.group(2)).split())
+        links.append((canonicalize_url(href, base_url), text))
+    return links
+
+class BestFirstFrontier(UrlFrontier):
+    """
+    Crawl frontier that pops the highest-scoring link first (ties in
+    insertion order). Entries keep UrlFrontier's compact packed form.
+    """
+
+    __slots__ = ("_heap", "_seq")
+
+    def __init__(self, root_url: str) -> None:
+        super().__init__(root_url)
+        self._heap: List[Tuple[float, int, bytes]] = []
+        self._seq = itertools.count()
+
+    def push(self, url: str, depth: int, text: str = "", score: Optional[float] = None) -> None:
+        if score is None:
+            score = score_link(url, text, depth)
+        heapq.heappush(self._heap, (-score, next(self._seq), self.pack(url, depth)))
+
+    def push_many(self, links: Iterable[Tuple[str, str]], depth: int) -> None:
+        for url, text in links:
+            self.push(url, depth, text)
+
+    def pop(self) -> Tuple[str, int]:
+        return self.unpack(heapq.heappop(self._heap)[2])
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
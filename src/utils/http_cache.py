@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from utils.url_canonicalizer import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Reads only note their access time; the notes are written in one batch
+# with the next store, or after this many reads.
+ACCESS_FLUSH_EVERY = 256
+# Expired entries are swept (and the size total re-read, since other
+# processes may share the file) at most this often.
+SWEEP_SECONDS = 60.0
+
+def cache_key(url: str) -> str:
+    """Canonical URL, so equivalent spellings share one cache entry."""
+    return canonicalize_url(url)
+
+def _charset(headers: Mapping[str, str]) -> Optional[str]:
+    content_type = ""
+    for name, value in headers.items():
+        if name.lower() == "content-type":
+            content_type = value
+            break
+    for part in content_type.split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip("\"' ")
+    return None
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return _charset(self.headers)
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.encoding or "utf-8", errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.stored_at
+
+class HttpCache:
+    """
+    On-disk HTTP response cache for re-crawls, stored in one SQLite file.
+
+    - Entries are keyed by normalized URL and keep body, headers, ETag and
+      Last-Modified.
+    - Entries younger than fresh_seconds are served without a request;
+      older ones are revalidated with If-None-Match / If-Modified-Since and
+      the cached body is reused on 304.
+    - Entries older than ttl_seconds are dropped, and the least recently
+      used entries are evicted once the cache exceeds max_bytes.
+    - Lookups never commit: access times are batched, and the total size
+      is kept as a running count instead of being summed on every store.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: float = 30 * 24 * 3600,
+        fresh_seconds: float = 0,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._total_size = 0
+        self._last_sweep = 0.0
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        with self._lock:
+            self._sweep_locked(time.time())
+            self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> Optional["HttpCache"]:
+        """Cache at http_cache_path, or None when it is not set."""
+        path = config.get("http_cache_path")
+        if not path:
+            return None
+        return cls(
+            path,
+            max_bytes=int(config.get("http_cache_max_mb", 512)) * 1024 * 1024,
+            ttl_seconds=float(config.get("http_cache_ttl_hours", 720)) * 3600,
+            fresh_seconds=float(config.get("http_cache_fresh_minutes", 0)) * 60,
+        )
+
+    # ------- Lookup -------
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Cached response for url, or None if missing or past its TTL."""
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, etag, last_modified, stored_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            # Expired entries are left for the next sweep
+            if row is None or now - row[6] > self.ttl_seconds:
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+                self._flush_access_locked()
+                self._conn.commit()
+
+        return CachedResponse(
+            url=row[0],
+            status=row[1],
+            headers=json.loads(row[2]),
+            body=row[3],
+            etag=row[4],
+            last_modified=row[5],
+            stored_at=row[6],
+        )
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.age() < self.fresh_seconds
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    # ------- Updates -------
+
+    def store(self, url: str, status: int, headers: Mapping[str, str], body: bytes) -> None:
+        if status != 200:
+            return
+        plain_headers = {str(k): str(v) for k, v in headers.items()}
+        lowered = {k.lower(): v for k, v in plain_headers.items()}
+        if "no-store" in lowered.get("cache-control", "").lower():
+            return
+        size = len(body)
+        if size > self.max_bytes:
+            return
+
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, status, headers, body, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    status,
+                    json.dumps(plain_headers),
+                    sqlite3.Binary(body),
+                    lowered.get("etag"),
+                    lowered.get("last-modified"),
+                    now,
+                    now,
+                    size,
+                ),
+            )
+            self._accessed.pop(key, None)
+            self._total_size += size - (replaced[0] if replaced else 0)
+            self._flush_access_locked()
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        """Record a 304: the cached body is current again as of now."""
+        lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE key = ?",
+                (now, now, lowered.get("etag"), lowered.get("last-modified"), cache_key(url)),
+            )
+            self._flush_access_locked()
+            self._conn.commit()
+
+    def _flush_access_locked(self) -> None:
+        if not self._accessed:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET last_access = ? WHERE key = ?",
+            [(at, key) for key, at in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _sweep_locked(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.ttl_seconds,))
+        self._total_size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        self._last_sweep = now
+
+    def _evict_locked(self, now: float) -> None:
+        if now - self._last_sweep >= SWEEP_SECONDS:
+            self._sweep_locked(now)
+        if self._total_size <= self.max_bytes:
+            return
+        evicted = 0
+        while self._total_size > self.max_bytes:
+            batch = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 256"
+            ).fetchall()
+            if not batch:
+                self._total_size = 0
+                break
+            for key, size in batch:
+                if self._total_size <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_size -= size
+                evicted += 1
+        logger.debug("HTTP cache evicted %d least recently used entries.", evicted)
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access_locked()
+            self._conn.commit()
+            self._conn.close()
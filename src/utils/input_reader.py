@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import logging
+import os
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+from utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+READ_CHUNK = 64 * 1024
+
+def _open_text(path: str) -> TextIO:
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8-sig")
+    return open(path, "r", encoding="utf-8-sig")
+
+def _url_of(item: Any) -> Optional[str]:
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        value = item.get("url")
+        return value if isinstance(value, str) else None
+    return None
+
+def _iter_json_array(f: TextIO) -> Iterator[str]:
+    """
+    Yield the URLs of a top-level JSON array one element at a time, reading
+    the file in chunks. Elements are strings or objects with a 'url' key.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK)
+    pos = buffer.index("[") + 1
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                if buffer[pos:].strip():
+                    logger.warning("Input JSON array ends with an unreadable element; stopping.")
+                return
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        pos = end
+        url = _url_of(item)
+        if url:
+            yield url
+        if pos > READ_CHUNK:
+            buffer, pos = buffer[pos:], 0
+
+def _iter_lines(f: TextIO) -> Iterator[str]:
+    """One URL per line; '#' comments are skipped and JSON object lines are accepted."""
+    for line in f:
+        raw = line.strip()
+        if not raw or raw.startswith("#"):
+            continue
+        if raw.startswith("{"):
+            try:
+                url = _url_of(json.loads(raw))
+            except ValueError:
+                url = None
+            if url:
+                yield url
+            continue
+        yield raw
+
+def _iter_raw_urls(path: str) -> Iterator[str]:
+    with _open_text(path) as f:
+        head = f.read(256)
+        while head and not head.strip():
+            head = f.read(256)
+        is_array = head.lstrip().startswith("[")
+        f.seek(0)
+        if is_array:
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_lines(f)
+
+def iter_input_urls(
+    path: str,
+    normalize: Callable[[str], str] = str.strip,
+    expected_urls: int = 1_000_000,
+    error_rate: float = 1e-6,
+) -> Iterator[str]:
+    """
+    Lazily yield unique, normalized seed URLs from path.
+
+    Accepts plain text (one URL per line, '#' comments), JSON lines, or a
+    JSON array of strings / {"url": ...} objects, optionally gzip-compressed.
+    Duplicates are dropped with a Bloom filter sized for expected_urls, so
+    memory stays bounded; a seed is wrongly dropped with probability at most
+    error_rate.
+
+    The path is checked eagerly so a missing file fails before crawling.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Input file not found: {path}")
+
+    def generate() -> Iterator[str]:
+        seen = BloomFilter(capacity=expected_urls, error_rate=error_rate)
+        total = 0
+        for raw in _iter_raw_urls(path):
+            url = normalize(raw)
+            if not url:
+                continue
+            total += 1
+            if seen.add(url):
+                yield url
+        logger.info(
+            "Read %d seed URL(s) from %s, %d unique (dedupe filter %.1f MB).",
+            total,
+            path,
+            len(seen),
+            seen.size_bytes / (1024 * 1024),
+        )
+
+    return generate()
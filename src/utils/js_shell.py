@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+# Regex-only heuristics: this runs on every statically fetched page, so it
+# must stay much cheaper than parsing the document.
+
+_SCRIPT_BLOCK = re.compile(r"<script\b[^>]*>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+_STYLE_BLOCK = re.compile(r"<style\b[^>]*>.*?</style\s*>", re.IGNORECASE | re.DOTALL)
+_NOSCRIPT_BLOCK = re.compile(r"<noscript\b[^>]*>(.*?)</noscript\s*>", re.IGNORECASE | re.DOTALL)
+_BODY = re.compile(r"<body\b[^>]*>(.*)</body\s*>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+_SCRIPT_SRC = re.compile(r"<script\b[^>]*\bsrc=[\"']([^\"']+)[\"']", re.IGNORECASE)
+_APP_ROOT = re.compile(
+    r"<div\b[^>]*\bid=[\"'](?:root|app|__next|__nuxt|svelte|main-app|ember-app)[\"'][^>]*>\s*</div>",
+    re.IGNORECASE,
+)
+_BUNDLE_NAME = re.compile(r"(?:bundle|chunk|vendor|runtime|main|app)[.\-][\w.\-]*\.js", re.IGNORECASE)
+_NOSCRIPT_WARNING = re.compile(
+    r"enable\s+javascript|javascript\s+(?:is\s+)?(?:required|disabled)|needs?\s+javascript|"
+    r"javascript\s+aktivieren|javascript\s+muss",
+    re.IGNORECASE,
+)
+_CONTACT_HINT = re.compile(r"@|mailto:|tel:|\[at\]|\(at\)", re.IGNORECASE)
+_HREF = re.compile(r"\bhref\s*=\s*[\"']([^\"']*)[\"']", re.IGNORECASE)
+
+MIN_VISIBLE_TEXT = 200
+SCRIPT_SHARE_THRESHOLD = 0.5
+BUNDLE_COUNT_THRESHOLD = 3
+STRONG_SIGNALS = {"empty_body", "app_root", "noscript_warning"}
+
+def _visible_text(html: str) -> str:
+    match = _BODY.search(html)
+    body = match.group(1) if match else html
+    body = _SCRIPT_BLOCK.sub(" ", body)
+    body = _STYLE_BLOCK.sub(" ", body)
+    body = _NOSCRIPT_BLOCK.sub(" ", body)
+    return _WHITESPACE.sub(" ", _TAG.sub(" ", body)).strip()
+
+def visible_text_length(html: str) -> int:
+    return len(_visible_text(html))
+
+def _has_contact_hint(html: str, text: str) -> bool:
+    # Only visible text and link targets count: @font-face / @media rules
+    # and <meta content="@handle"> are markup, not contacts
+    if _CONTACT_HINT.search(text):
+        return True
+    return any(_CONTACT_HINT.search(href) for href in _HREF.findall(html))
+
+def js_shell_signals(html: str) -> List[str]:
+    """
+    Return the reasons a statically fetched page looks like a JavaScript app
+    shell: 'empty_body', 'app_root', 'script_heavy', 'bundles',
+    'noscript_warning' and 'no_contacts'.
+    """
+    if not html:
+        return ["empty_body", "no_contacts"]
+
+    signals: List[str] = []
+    text = _visible_text(html)
+    if len(text) < MIN_VISIBLE_TEXT:
+        signals.append("empty_body")
+    if _APP_ROOT.search(html):
+        signals.append("app_root")
+
+    inline_script = sum(len(m.group(1)) for m in _SCRIPT_BLOCK.finditer(html))
+    if inline_script / len(html) >= SCRIPT_SHARE_THRESHOLD:
+        signals.append("script_heavy")
+    bundles = [src for src in _SCRIPT_SRC.findall(html) if _BUNDLE_NAME.search(src)]
+    if len(bundles) >= BUNDLE_COUNT_THRESHOLD:
+        signals.append("bundles")
+
+    if any(_NOSCRIPT_WARNING.search(block) for block in _NOSCRIPT_BLOCK.findall(html)):
+        signals.append("noscript_warning")
+
+    if not _has_contact_hint(html, text):
+        signals.append("no_contacts")
+    return signals
+
+def looks_like_js_shell(html: str) -> bool:
+    """
+    True when a page should be re-fetched in a browser: nothing contact-like
+    is in the static HTML and the page is either structurally empty or made
+    up mostly of script bundles. Script-heavy pages that do carry content
+    are left alone, since most server-rendered sites ship bundles too.
+    """
+    signals = set(js_shell_signals(html))
+    if "no_contacts" not in signals:
+        return False
+    return bool(signals & STRONG_SIGNALS) or {"script_heavy", "bundles"} <= signals
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import importlib.util
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, CData, NavigableString
+
+# Subtrees whose text is never visible page content.
+NON_VISIBLE_TAGS = ("script", "style", "noscript")
+
+# hrefs that never point at another page.
+SKIPPED_HREF_PREFIXES = ("#", "mailto:", "tel:", "javascript:")
+
+def select_parser(preferred: Optional[str] = None) -> str:
+    """
+    Pick the fastest BeautifulSoup tree builder that is installed.
+    lxml (C-based) is preferred; html.parser is always available.
+    """
+    if preferred:
+        return preferred
+    if importlib.util.find_spec("lxml") is not None:
+        return "lxml"
+    return "html.parser"
+
+DEFAULT_PARSER = select_parser()
+
+class PageDocument:
+    """
+    A fetched page shared by every extractor and link finder.
+
+    The parse tree, visible text, anchor list and link list are built lazily
+    and at most once, so a page is parsed a single time no matter how many
+    consumers look at it.
+    """
+
+    def __init__(self, html: str, url: str = "", parser: Optional[str] = None) -> None:
+        self.html = html or ""
+        self.url = url
+        self.parser = parser or DEFAULT_PARSER
+        self._soup: Optional[BeautifulSoup] = None
+        self._text: Optional[str] = None
+        self._full_text: Optional[str] = None
+        self._anchors: Optional[List[Tuple[str, str]]] = None
+        self._link_anchors: Optional[List[Tuple[str, str]]] = None
+
+    @classmethod
+    def of(cls, source: "str | PageDocument", url: str = "") -> "PageDocument":
+        """Wrap raw HTML, or return an existing document unchanged."""
+        if isinstance(source, PageDocument):
+            return source
+        return cls(source, url)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, self.parser)
+        return self._soup
+
+    @property
+    def text(self) -> str:
+        """Visible text: script, style and noscript content is left out."""
+        if self._text is None:
+            parts: List[str] = []
+            for string in self.soup.find_all(string=True):
+                if string.find_parent(NON_VISIBLE_TAGS) is not None:
+                    continue
+                if type(string) not in (NavigableString, CData):
+                    continue  # comments, doctype, processing instructions
+                stripped = string.strip()
+                if stripped:
+                    parts.append(stripped)
+            self._text = " ".join(parts)
+        return self._text
+
+    @property
+    def full_text(self) -> str:
+        """All text nodes, including inline scripts (what soup.get_text returns)."""
+        if self._full_text is None:
+            self._full_text = self.soup.get_text(" ", strip=True)
+        return self._full_text
+
+    @property
+    def title(self) -> str:
+        title_tag = self.soup.find("title")
+        return title_tag.get_text(strip=True) if title_tag else ""
+
+    @property
+    def anchors(self) -> List[Tuple[str, str]]:
+        """(href, anchor text) for every <a href> on the page, href stripped."""
+        if self._anchors is None:
+            self._anchors = [
+                (a["href"].strip(), a.get_text(" ", strip=True))
+                for a in self.soup.find_all("a", href=True)
+            ]
+        return self._anchors
+
+    @property
+    def link_anchors(self) -> List[Tuple[str, str]]:
+        """
+        (absolute URL, anchor text) for anchors that point at other pages,
+        one entry per URL in page order; texts of repeated links are joined.
+        """
+        if self._link_anchors is None:
+            texts: dict[str, List[str]] = {}
+            for href, text in self.anchors:
+                if not href or href.lower().startswith(SKIPPED_HREF_PREFIXES):
+                    continue
+                bucket = texts.setdefault(urljoin(self.url, href), [])
+                if text:
+                    bucket.append(text)
+            self._link_anchors = [(url, " ".join(parts)) for url, parts in texts.items()]
+        return self._link_anchors
+
+    @property
+    def links(self) -> List[str]:
+        """Unique absolute URLs of anchors that point at other pages, in page order."""
+        return [url for url, _ in self.link_anchors]
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean the exit IP itself is blocked, not the page.
+BAN_STATUSES = frozenset({403, 407, 429})
+
+class NoProxyAvailable(Exception):
+    """Every proxy is quarantined or busy past the acquire timeout."""
+
+@dataclass
+class ProxyStats:
+    url: str
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    bans: int = 0
+    latency: float = 1.0  # EWMA, seconds
+    error_rate: float = 0.0  # EWMA of failures and bans
+    strikes: int = 0
+    quarantined_until: float = 0.0
+
+    def weight(self, max_in_flight: int) -> float:
+        health = (1.0 - self.error_rate) ** 2
+        free = (max_in_flight - self.in_flight) / max_in_flight
+        return max(1e-6, health * free / max(self.latency, 0.05))
+
+class ProxyLease:
+    """
+    One request's claim on a proxy. Report the response status with
+    observe(); leaving the with-block releases the slot, and counts a
+    failure if it is left by an exception before any status was observed.
+    """
+
+    def __init__(self, pool: "ProxyPool", stats: ProxyStats) -> None:
+        self.pool = pool
+        self.proxy = stats.url
+        self._stats = stats
+        self._started = time.monotonic()
+        self._done = False
+
+    @property
+    def proxies(self) -> Dict[str, str]:
+        """requests-style proxies mapping."""
+        return {"http": self.proxy, "https": self.proxy}
+
+    def observe(self, status: int) -> None:
+        if not self._done:
+            self._done = True
+            self.pool._report(self._stats, time.monotonic() - self._started, status=status)
+
+    def fail(self) -> None:
+        if not self._done:
+            self._done = True
+            self.pool._report(self._stats, time.monotonic() - self._started, failed=True)
+
+    def __enter__(self) -> "ProxyLease":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is not None:
+            self.fail()
+        self.pool._release(self._stats)
+
+    async def __aenter__(self) -> "ProxyLease":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+class ProxyPool:
+    """
+    Routes requests over a list of proxies.
+
+    - A proxy is picked at random, weighted by health / latency and by its
+      free slots; each carries at most max_in_flight requests at once.
+    - Latency and error rate are exponentially weighted (alpha); ban
+      statuses (BAN_STATUSES) count as errors.
+    - Once a proxy has served min_requests, an error rate above
+      error_threshold quarantines it for quarantine_seconds, doubling with
+      each further quarantine up to max_quarantine_seconds. It is
+      re-admitted on probation afterwards.
+    - A page banned through page_ban_proxies different proxies is blocked
+      for all of them (see page_banned), not a sign of a bad exit IP.
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[str],
+        max_in_flight: int = 4,
+        alpha: float = 0.2,
+        error_threshold: float = 0.5,
+        min_requests: int = 5,
+        quarantine_seconds: float = 60.0,
+        max_quarantine_seconds: float = 900.0,
+        acquire_timeout: float = 60.0,
+        page_ban_proxies: int = 2,
+    ) -> None:
+        self._stats = [ProxyStats(url) for url in dict.fromkeys(p.strip() for p in proxies) if url]
+        if not self._stats:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.max_in_flight = max(1, max_in_flight)
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine_seconds = max_quarantine_seconds
+        self.acquire_timeout = acquire_timeout
+        self.page_ban_proxies = max(1, page_ban_proxies)
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> Optional["ProxyPool"]:
+        """Pool from proxy_list / proxy_list_path, or None when neither is set."""
+        proxies: List[str] = list(config.get("proxy_list") or [])
+        path = config.get("proxy_list_path")
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                proxies.extend(
+                    line.strip() for line in f if line.strip() and not line.startswith("#")
+                )
+        if not proxies:
+            return None
+        return cls(
+            proxies,
+            max_in_flight=int(config.get("proxy_max_in_flight", 4)),
+            quarantine_seconds=float(config.get("proxy_quarantine_seconds", 60)),
+            acquire_timeout=float(config.get("proxy_acquire_timeout", 60)),
+            page_ban_proxies=int(config.get("proxy_page_ban_proxies", 2)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    @property
+    def urls(self) -> List[str]:
+        return [s.url for s in self._stats]
+
+    # ------- Selection -------
+
+    def _pick_locked(self) -> Optional[ProxyStats]:
+        now = time.monotonic()
+        candidates = []
+        for stats in self._stats:
+            if stats.quarantined_until:
+                if stats.quarantined_until > now:
+                    continue
+                # Re-admitted on probation: one more bad run sends it back
+                stats.quarantined_until = 0.0
+                stats.error_rate = self.error_threshold / 2
+                logger.info("Proxy %s re-admitted after quarantine", stats.url)
+            if stats.in_flight < self.max_in_flight:
+                candidates.append(stats)
+        if not candidates:
+            return None
+        weights = [s.weight(self.max_in_flight) for s in candidates]
+        stats = random.choices(candidates, weights=weights)[0]
+        stats.in_flight += 1
+        stats.requests += 1
+        return stats
+
+    def _wait_hint_locked(self) -> float:
+        """Seconds until a quarantined proxy is re-admitted (a busy one frees up sooner)."""
+        now = time.monotonic()
+        releases = [s.quarantined_until - now for s in self._stats if s.quarantined_until > now]
+        if len(releases) == len(self._stats):
+            return max(0.01, min(releases))
+        return 0.5
+
+    def try_acquire(self) -> Optional[ProxyLease]:
+        with self._cond:
+            stats = self._pick_locked()
+        return ProxyLease(self, stats) if stats is not None else None
+
+    def acquire(self, timeout: Optional[float] = None) -> ProxyLease:
+        """Lease a proxy, waiting up to timeout (default acquire_timeout) for one."""
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        with self._cond:
+            while True:
+                stats = self._pick_locked()
+                if stats is not None:
+                    return ProxyLease(self, stats)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise NoProxyAvailable("no healthy proxy available")
+                self._cond.wait(min(self._wait_hint_locked(), remaining))
+
+    async def acquire_async(self, timeout: Optional[float] = None, poll: float = 0.05) -> ProxyLease:
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        while True:
+            lease = self.try_acquire()
+            if lease is not None:
+                return lease
+            if time.monotonic() >= deadline:
+                raise NoProxyAvailable("no healthy proxy available")
+            await asyncio.sleep(poll)
+
+    # ------- Feedback -------
+
+    def _report(
+        self, stats: ProxyStats, latency: float, status: Optional[int] = None, failed: bool = False
+    ) -> None:
+        banned = status in BAN_STATUSES
+        bad = failed or banned
+        with self._cond:
+            stats.latency += self.alpha * (latency - stats.latency)
+            stats.error_rate += self.alpha * ((1.0 if bad else 0.0) - stats.error_rate)
+            if failed:
+                stats.failures += 1
+            if banned:
+                stats.bans += 1
+            if stats.quarantined_until:
+                return
+            if stats.requests >= self.min_requests and stats.error_rate > self.error_threshold:
+                self._quarantine_locked(stats, f"HTTP {status}" if banned else "errors")
+
+    def page_banned(self, banned_by: Collection[str]) -> bool:
+        """
+        Whether a page that returned ban statuses through the proxies in
+        banned_by is blocked for every proxy, so its status is final rather
+        than retried through yet another proxy.
+        """
+        return len(set(banned_by)) >= min(self.page_ban_proxies, len(self._stats))
+
+    def _quarantine_locked(self, stats: ProxyStats, reason: str) -> None:
+        duration = min(self.max_quarantine_seconds, self.quarantine_seconds * (2 ** stats.strikes))
+        stats.strikes += 1
+        stats.quarantined_until = time.monotonic() + duration
+        logger.warning("Quarantining proxy %s for %.0fs (%s)", stats.url, duration, reason)
+
+    def _release(self, stats: ProxyStats) -> None:
+        with self._cond:
+            stats.in_flight -= 1
+            self._cond.notify()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "proxy": s.url,
+                    "requests": s.requests,
+                    "failures": s.failures,
+                    "bans": s.bans,
+                    "latency": round(s.latency, 3),
+                    "error_rate": round(s.error_rate, 3),
+                    "quarantined": s.quarantined_until > now,
+                }
+                for s in self._stats
+            ]
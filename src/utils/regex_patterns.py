@@ -1,5 +1,5 @@
 thonimport re
-from typing import Dict, Pattern
+from typing import Dict, List, Pattern
 
 # Basic but practical email detection pattern
 EMAIL_REGEX: Pattern[str] = re.compile(
@@ -33,19 +33,22 @@ CONTACT_PAGE_KEYWORDS = [
 "crew",
 ]
 
-SOCIAL_DOMAINS: Dict[str, str] = {
-"linkedin": "linkedin.com",
-"twitter": "twitter.com",
-"x": "x.com",
-"facebook": "facebook.com",
-"instagram": "instagram.com",
-"youtube": "youtube.com",
-"tiktok": "tiktok.com",
-"github": "github.com",
-"gitlab": "gitlab.com",
-"behance": "behance.net",
-"dribbble": "dribbble.com",
+# Platform (as reported in records) -> domains hosting its profiles
+SOCIAL_DOMAINS: Dict[str, List[str]] = {
+"LinkedIn": ["linkedin.com"],
+"Twitter": ["twitter.com", "x.com"],
+"Facebook": ["facebook.com"],
+"Instagram": ["instagram.com"],
+"YouTube": ["youtube.com", "youtu.be"],
+"TikTok": ["tiktok.com"],
+"GitHub": ["github.com"],
+"GitLab": ["gitlab.com"],
+"Dribbble": ["dribbble.com"],
+"Behance": ["behance.net"],
 }
 
 # Social URL generic pattern (we still check the domain separately)
-SOCIAL_URL_REGEX: Pattern[str] = re.compile(
\ No newline at end of file
+SOCIAL_URL_REGEX: Pattern[str] = re.compile(
+r"https?://(?:[a-z0-9-]+\.)*[a-z0-9-]+\.[a-z]{2,}/[^\s\"'<>]*",
+re.IGNORECASE,
+)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (now or time.time()))
+
+class LatencyTracker:
+    """
+    Recent response times per host, turned into per-host timeouts.
+
+    A host's timeout is multiplier x its percentile latency over the last
+    window responses, clamped to [min_timeout, max_timeout]. Hosts with
+    fewer than min_samples responses get max_timeout (the configured one).
+    """
+
+    def __init__(
+        self,
+        max_timeout: float = 15.0,
+        min_timeout: float = 3.0,
+        percentile: float = 0.95,
+        multiplier: float = 4.0,
+        window: int = 64,
+        min_samples: int = 5,
+    ) -> None:
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, seconds: float) -> None:
+        host = _host(url)
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def latency(self, url: str) -> Optional[float]:
+        """The host's percentile latency, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(_host(url)) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+    def timeout_for(self, url: str) -> float:
+        latency = self.latency(url)
+        if latency is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, latency * self.multiplier))
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of first attempts, so retries cannot
+    multiply load when many requests fail at once.
+
+    Every first attempt deposits ratio tokens (up to max_tokens); every
+    retry withdraws one. The bucket starts with min_tokens so a quiet
+    crawler can still retry a few early failures.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_tokens: float = 10.0, max_tokens: float = 100.0) -> None:
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_tokens)
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed fetch is retried.
+
+    - Retried: connection errors, timeouts and RETRY_STATUSES responses,
+      up to max_retries times per request.
+    - Delays use exponential backoff with full jitter, or the server's
+      Retry-After when given; a Retry-After above max_delay gives up.
+    - Every retry needs a token from the shared RetryBudget.
+    - Timeouts come from the LatencyTracker when adaptive_timeouts is on.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        budget: Optional[RetryBudget] = None,
+        latency: Optional[LatencyTracker] = None,
+        timeout: float = 15.0,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.latency = latency
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], timeout: Optional[float] = None) -> "RetryPolicy":
+        timeout = float(timeout if timeout is not None else config.get("timeout", 15))
+        latency = None
+        if config.get("adaptive_timeouts", True):
+            latency = LatencyTracker(
+                max_timeout=timeout,
+                min_timeout=float(config.get("min_timeout", 3.0)),
+            )
+        return cls(
+            max_retries=int(config.get("retry_max_retries", 2)),
+            base_delay=float(config.get("retry_base_delay", 0.5)),
+            max_delay=float(config.get("retry_max_delay", 30.0)),
+            budget=RetryBudget(ratio=float(config.get("retry_budget_ratio", 0.1))),
+            latency=latency,
+            timeout=timeout,
+        )
+
+    def timeout_for(self, url: str) -> float:
+        return self.latency.timeout_for(url) if self.latency is not None else self.timeout
+
+    def begin(self, url: str, attempt: int) -> float:
+        """Start attempt number attempt (0 first) on url; return its timeout."""
+        if attempt == 0:
+            self.budget.deposit()
+        return self.timeout_for(url)
+
+    def record(self, url: str, seconds: float) -> None:
+        """Record how long url took to answer (or the timeout it hit)."""
+        if self.latency is not None:
+            self.latency.record(url, seconds)
+
+    def should_retry(self, status: int) -> bool:
+        return status in RETRY_STATUSES
+
+    def retry_delay(
+        self,
+        attempt: int,
+        status: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[float]:
+        """
+        Seconds to wait before retry number attempt + 1 of a request that
+        failed with status (None for a connection error or timeout), or
+        None to give up.
+        """
+        if status is not None and not self.should_retry(status):
+            return None
+        if attempt >= self.max_retries:
+            return None
+        retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+        if retry_after is not None and retry_after > self.max_delay:
+            return None
+        if not self.budget.try_withdraw():
+            return None
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
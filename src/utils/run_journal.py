@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class RunJournal:
+    """
+    Append-only JSONL journal of finished root URLs and their records.
+
+    Each site is written as one line and fsynced before the run moves on, so
+    after a crash the journal holds every site that completed. A torn last
+    line (the write the crash interrupted) is ignored on load.
+
+    With keep_records=False only the finished root URLs are kept in memory,
+    for runs whose records are streamed to the output as they arrive.
+    """
+
+    def __init__(self, path: str, resume: bool = False, keep_records: bool = True) -> None:
+        self.path = path
+        self.keep_records = keep_records
+        self.completed: Dict[str, List[Dict[str, Any]]] = {}
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        if resume and os.path.exists(path):
+            self._load()
+            logger.info(
+                "Resuming from journal %s: %d site(s) already done.",
+                path,
+                len(self.completed),
+            )
+        self._fh = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _load(self) -> None:
+        good_bytes = 0
+        with open(self.path, "rb") as f:
+            for lineno, raw in enumerate(f, start=1):
+                if not raw.endswith(b"\n"):
+                    logger.warning("Dropping torn last line %d of %s", lineno, self.path)
+                    break
+                try:
+                    entry = json.loads(raw.decode("utf-8"))
+                    self.completed[entry["root_url"]] = (
+                        entry["records"] if self.keep_records else []
+                    )
+                except (ValueError, KeyError, TypeError):
+                    if raw.strip():
+                        logger.warning("Ignoring unreadable journal line %d in %s", lineno, self.path)
+                good_bytes += len(raw)
+        # Cut off a partial write so new entries start on a fresh line.
+        with open(self.path, "r+b") as f:
+            f.truncate(good_bytes)
+
+    def is_done(self, root_url: str) -> bool:
+        return root_url in self.completed
+
+    def pending(self, urls: List[str]) -> List[str]:
+        return [url for url in urls if url not in self.completed]
+
+    def record(self, root_url: str, records: List[Dict[str, Any]]) -> None:
+        """Durably mark root_url as finished with the given records."""
+        entry = {"root_url": root_url, "finished_at": time.time(), "records": records}
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self.completed[root_url] = records if self.keep_records else []
+
+    def records_for(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Journaled records of the given root URLs, in the order given."""
+        records: List[Dict[str, Any]] = []
+        for url in urls:
+            records.extend(self.completed.get(url, []))
+        return records
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import html as html_lib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Set
+from urllib.parse import urlsplit
+
+from utils.email_anchors import at_anchors, iter_anchored_matches
+from utils.regex_patterns import EMAIL_REGEX, SOCIAL_DOMAINS
+
+CONTACT_FIELDS = ("emails", "phones", "socials")
+
+STOP_REQUIRED_FILLED = "required_fields_filled"
+STOP_NO_NEW_CONTACTS = "no_new_contacts"
+
+# Cheap probes, run on every fetched page. They only decide when to stop
+# crawling; the extractors still do the real work on the fetched pages.
+_TEL_HREF = re.compile(r"""href\s*=\s*["']tel:([^"']+)["']""", re.IGNORECASE)
+_INTL_PHONE = re.compile(r"(?<![\w+])\+\d{1,3}[\s./-]?(?:\(0\)\s?)?(?:\d[\s./-]?){6,13}\d(?!\d)")
+_HREF = re.compile(r"""href\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_MAILTO_HREF = re.compile(r"""href\s*=\s*["']mailto:([^"'?]+)""", re.IGNORECASE)
+_SOCIAL_HOSTS = tuple(domain for domains in SOCIAL_DOMAINS.values() for domain in domains)
+# Retina asset names such as logo@2x.png look like emails
+_ASSET_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".css", ".js")
+
+def probe_contacts(html: str) -> Dict[str, Set[str]]:
+    """
+    Rough contact signals found in raw HTML: emails (text and mailto:),
+    phones (tel: links and +country-code numbers) and social profile hosts.
+    """
+    text = html_lib.unescape(html)
+    emails = {
+        m.group(0).lower()
+        for m in iter_anchored_matches(text, EMAIL_REGEX, at_anchors(text))
+        if not m.group(0).lower().endswith(_ASSET_SUFFIXES)
+    }
+    emails.update(m.strip().lower() for m in _MAILTO_HREF.findall(text))
+
+    phones = {re.sub(r"[^\d+]", "", m) for m in _TEL_HREF.findall(text)}
+    phones.update(re.sub(r"[^\d+]", "", m) for m in _INTL_PHONE.findall(text))
+
+    socials: Set[str] = set()
+    for href in _HREF.findall(text):
+        host = (urlsplit(href.strip()).hostname or "").lower()
+        if host and any(host == d or host.endswith("." + d) for d in _SOCIAL_HOSTS):
+            socials.add(href.strip().lower().split("?")[0].rstrip("/"))
+
+    return {"emails": emails, "phones": {p for p in phones if p}, "socials": socials}
+
+@dataclass(frozen=True)
+class SaturationPolicy:
+    """
+    When to stop crawling a site early.
+
+    - required: minimum number of distinct values per field ('emails',
+      'phones', 'socials'); the crawl stops once every listed field has them.
+      Fields left out (or set to 0) are not required.
+    - patience: stop after this many consecutive pages without any new
+      contact value; 0 disables this rule.
+    """
+
+    required: Mapping[str, int] = field(
+        default_factory=lambda: {"emails": 1, "phones": 1, "socials": 1}
+    )
+    patience: int = 3
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> Optional["SaturationPolicy"]:
+        """Policy from the saturation_* settings, or None when it is disabled."""
+        if not config.get("use_saturation"):
+            return None
+        required = config.get("saturation_required")
+        if required is None:
+            required = {"emails": 1, "phones": 1, "socials": 1}
+        unknown = set(required) - set(CONTACT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown saturation fields: {sorted(unknown)}")
+        return cls(
+            required={k: int(v) for k, v in required.items() if int(v) > 0},
+            patience=int(config.get("saturation_patience", 3)),
+        )
+
+class SaturationTracker:
+    """Per-site state for a SaturationPolicy; feed it every fetched page."""
+
+    def __init__(self, policy: SaturationPolicy) -> None:
+        self.policy = policy
+        self.found: Dict[str, Set[str]] = {name: set() for name in CONTACT_FIELDS}
+        self.pages = 0
+        self.stale_pages = 0
+        self.reason: Optional[str] = None
+
+    def observe_html(self, html: str) -> Optional[str]:
+        return self.observe(probe_contacts(html))
+
+    def observe(self, contacts: Mapping[str, Set[str]]) -> Optional[str]:
+        """Record one page's contacts; return the stop reason once saturated."""
+        self.pages += 1
+        new_values = 0
+        for name in CONTACT_FIELDS:
+            values = set(contacts.get(name) or ()) - self.found[name]
+            new_values += len(values)
+            self.found[name] |= values
+        self.stale_pages = 0 if new_values else self.stale_pages + 1
+
+        required = self.policy.required
+        if required and all(len(self.found[name]) >= n for name, n in required.items()):
+            self.reason = STOP_REQUIRED_FILLED
+        elif self.policy.patience and self.stale_pages >= self.policy.patience:
+            self.reason = STOP_NO_NEW_CONTACTS
+        return self.reason
+
+    def describe(self) -> str:
+        counts = ", ".join(f"{len(self.found[n])} {n}" for n in CONTACT_FIELDS)
+        return f"{self.reason} after {self.pages} page(s) ({counts})"
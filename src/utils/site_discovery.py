@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import gzip
+import html
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Mapping, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from utils.frontier import score_link
+from utils.url_canonicalizer import canonicalize_url, same_site
+
+logger = logging.getLogger(__name__)
+
+# Returns the body of a 200 response, or None for anything else.
+Fetcher = Callable[[str], Optional[bytes]]
+AsyncFetcher = Callable[[str], Awaitable[Optional[bytes]]]
+
+_LOC = re.compile(r"<loc>\s*(.*?)\s*</loc>", re.IGNORECASE | re.DOTALL)
+_SITEMAP_INDEX = re.compile(r"<sitemapindex\b", re.IGNORECASE)
+
+@dataclass
+class SiteInfo:
+    """robots.txt rules and contact-page seeds for one host."""
+
+    origin: str
+    user_agent: str = "*"
+    robots: Optional[RobotFileParser] = None
+    seeds: List[Tuple[str, float]] = field(default_factory=list)
+    sitemaps_read: int = 0
+
+    def allowed(self, url: str) -> bool:
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(self.user_agent, url)
+
+def _decode(body: bytes) -> str:
+    if body[:2] == b"\x1f\x8b":
+        try:
+            body = gzip.decompress(body)
+        except OSError:
+            return ""
+    return body.decode("utf-8", errors="replace")
+
+def parse_sitemap(text: str) -> Tuple[List[str], List[str]]:
+    """(child sitemap URLs, page URLs) listed in a sitemap or sitemap index."""
+    locs = [html.unescape(loc) for loc in _LOC.findall(text)]
+    if _SITEMAP_INDEX.search(text):
+        return locs, []
+    return [], locs
+
+class SiteDiscovery:
+    """
+    Fetches robots.txt and sitemaps once per host and keeps the result.
+
+    - robots.txt Disallow rules are exposed through SiteInfo.allowed().
+    - Sitemaps come from robots.txt 'Sitemap:' lines, falling back to
+      /sitemap.xml; indexes are followed up to max_sitemaps documents.
+    - Listed same-site URLs whose link score reaches min_seed_score (i.e.
+      the path carries a contact/imprint/team keyword) become seeds, best
+      first, at most max_seeds of them.
+    """
+
+    def __init__(
+        self,
+        user_agent: str = "*",
+        max_sitemaps: int = 5,
+        max_seeds: int = 10,
+        min_seed_score: float = 1.0,
+        max_hosts: int = 10000,
+    ) -> None:
+        self.user_agent = user_agent or "*"
+        self.max_sitemaps = max_sitemaps
+        self.max_seeds = max_seeds
+        self.min_seed_score = min_seed_score
+        self.max_hosts = max_hosts
+        self._cache: "OrderedDict[str, SiteInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> Optional["SiteDiscovery"]:
+        """Discovery from the discovery_* settings, or None when it is disabled."""
+        if not config.get("use_site_discovery"):
+            return None
+        return cls(
+            user_agent=config.get("user_agent") or "*",
+            max_sitemaps=int(config.get("discovery_max_sitemaps", 5)),
+            max_seeds=int(config.get("discovery_max_seeds", 10)),
+        )
+
+    # ------- Cache -------
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(canonicalize_url(url))
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _cached(self, origin: str) -> Optional[SiteInfo]:
+        with self._lock:
+            info = self._cache.get(origin)
+            if info is not None:
+                self._cache.move_to_end(origin)
+            return info
+
+    def _remember(self, info: SiteInfo) -> SiteInfo:
+        with self._lock:
+            self._cache[info.origin] = info
+            while len(self._cache) > self.max_hosts:
+                self._cache.popitem(last=False)
+        return info
+
+    def allowed(self, url: str) -> bool:
+        """robots.txt verdict for url; True when its host was never discovered."""
+        info = self._cached(self._origin(url))
+        return info is None or info.allowed(url)
+
+    # ------- Discovery -------
+
+    def _parse_robots(self, info: SiteInfo, body: Optional[bytes]) -> List[str]:
+        """Store the robots rules; return the sitemap URLs to read."""
+        if body is not None:
+            robots = RobotFileParser()
+            robots.parse(_decode(body).splitlines())
+            info.robots = robots
+            listed = robots.site_maps() or []
+            if listed:
+                return [urljoin(info.origin + "/", url) for url in listed]
+        return [info.origin + "/sitemap.xml"]
+
+    def _collect_seeds(self, info: SiteInfo, root_url: str, urls: List[str]) -> None:
+        scored = {}
+        for url in urls:
+            if not same_site(root_url, url):
+                continue
+            score = score_link(url)
+            if score >= self.min_seed_score and info.allowed(url):
+                scored[canonicalize_url(url)] = score
+        ranked = sorted(scored.items(), key=lambda item: -item[1])
+        info.seeds = ranked[: self.max_seeds]
+        logger.debug(
+            "Discovered %d seed(s) for %s from %d sitemap(s)",
+            len(info.seeds),
+            info.origin,
+            info.sitemaps_read,
+        )
+
+    def _read_sitemap(
+        self, info: SiteInfo, body: Optional[bytes], pending: List[str], urls: List[str]
+    ) -> None:
+        info.sitemaps_read += 1
+        if body is None:
+            return
+        children, pages = parse_sitemap(_decode(body))
+        # Page sitemaps of an index are usually named after their content
+        children.sort(key=lambda u: -score_link(u))
+        pending.extend(children)
+        urls.extend(pages)
+
+    def discover(self, root_url: str, fetch: Fetcher) -> SiteInfo:
+        origin = self._origin(root_url)
+        info = self._cached(origin)
+        if info is not None:
+            return info
+
+        info = SiteInfo(origin=origin, user_agent=self.user_agent)
+        pending = self._parse_robots(info, self._safe_fetch(fetch, origin + "/robots.txt"))
+        urls: List[str] = []
+        while pending and info.sitemaps_read < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            self._read_sitemap(info, self._safe_fetch(fetch, sitemap_url), pending, urls)
+        self._collect_seeds(info, root_url, urls)
+        return self._remember(info)
+
+    async def discover_async(self, root_url: str, fetch: AsyncFetcher) -> SiteInfo:
+        origin = self._origin(root_url)
+        info = self._cached(origin)
+        if info is not None:
+            return info
+
+        info = SiteInfo(origin=origin, user_agent=self.user_agent)
+        body = await self._safe_fetch_async(fetch, origin + "/robots.txt")
+        pending = self._parse_robots(info, body)
+        urls: List[str] = []
+        while pending and info.sitemaps_read < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            body = await self._safe_fetch_async(fetch, sitemap_url)
+            self._read_sitemap(info, body, pending, urls)
+        self._collect_seeds(info, root_url, urls)
+        return self._remember(info)
+
+    @staticmethod
+    def _safe_fetch(fetch: Fetcher, url: str) -> Optional[bytes]:
+        try:
+            return fetch(url)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Discovery fetch of %s failed: %s", url, exc)
+            return None
+
+    @staticmethod
+    async def _safe_fetch_async(fetch: AsyncFetcher, url: str) -> Optional[bytes]:
+        try:
+            return await fetch(url)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Discovery fetch of %s failed: %s", url, exc)
+            return None
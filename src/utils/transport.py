@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import atexit
+import importlib.util
+import ssl
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts whose idle keep-alive connections are kept per requests.Session;
+# each host pool holds up to pool_size connections.
+DEFAULT_POOL_HOSTS = 256
+KEEPALIVE_EXPIRY = 30.0
+
+def http2_available() -> bool:
+    """httpx speaks HTTP/2 only with the optional 'h2' package installed."""
+    return importlib.util.find_spec("h2") is not None
+
+def brotli_available() -> bool:
+    """
+    requests/urllib3 and httpx add 'br' to Accept-Encoding and decode it
+    by themselves once 'brotli' (or 'brotlicffi') is importable.
+    """
+    return any(importlib.util.find_spec(name) for name in ("brotli", "brotlicffi"))
+
+_ssl_context: Optional[ssl.SSLContext] = None
+_ssl_lock = threading.Lock()
+
+def shared_ssl_context() -> ssl.SSLContext:
+    """
+    One verifying SSLContext for all async clients. Building a context
+    loads the whole CA bundle, and connections made from the same context
+    can resume TLS sessions. (requests already shares its own context.)
+    """
+    global _ssl_context
+    with _ssl_lock:
+        if _ssl_context is None:
+            try:
+                import certifi  # type: ignore
+
+                cafile: Optional[str] = certifi.where()
+            except ImportError:  # noqa: BLE001
+                cafile = None
+            _ssl_context = ssl.create_default_context(cafile=cafile)
+        return _ssl_context
+
+def make_session(pool_size: int = 10, pool_hosts: int = DEFAULT_POOL_HOSTS) -> requests.Session:
+    """requests.Session whose per-host pools keep up to pool_size connections alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=max(1, pool_size))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_shared_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_http_session(**kwargs: Any) -> requests.Session:
+    """
+    Return the process-wide requests.Session, creating it on first use.
+    Keyword arguments (see make_session) only apply to that first call.
+    Callers pass their own headers per request; the session keeps none.
+    """
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            _shared_session = make_session(**kwargs)
+            atexit.register(_shared_session.close)
+        return _shared_session
+
+def make_async_client(
+    httpx: Any,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 15,
+    proxy: Optional[str] = None,
+    max_connections: int = 10,
+    http2: bool = True,
+) -> Any:
+    """
+    httpx.AsyncClient with keep-alive pools sized to max_connections and
+    HTTP/2 multiplexing when requested and available.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout,
+        follow_redirects=True,
+        proxy=proxy,
+        limits=limits,
+        http2=http2 and http2_available(),
+        verify=shared_ssl_context(),
+    )
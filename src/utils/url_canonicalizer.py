@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import re
+from typing import Optional
+from urllib.parse import SplitResult, parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that never change page content.
+TRACKING_PARAMS = frozenset(
+    {
+        "gclid",
+        "gclsrc",
+        "dclid",
+        "fbclid",
+        "msclkid",
+        "yclid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "_ga",
+        "_gl",
+        "_hsenc",
+        "_hsmi",
+        "mkt_tok",
+        "oly_anon_id",
+        "oly_enc_id",
+        "vero_id",
+        "wickedid",
+        # Session identifiers
+        "sid",
+        "sessionid",
+        "session_id",
+        "jsessionid",
+        "phpsessid",
+        "aspsessionid",
+        "cfid",
+        "cftoken",
+    }
+)
+TRACKING_PREFIXES = ("utm_", "pk_", "piwik_", "matomo_", "hsa_")
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# ;jsessionid=... style session ids embedded in the path
+_PATH_SESSION = re.compile(r";(?:jsessionid|phpsessid|sid)=[^/?#]*", re.IGNORECASE)
+_PERCENT_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+
+def _is_tracking(name: str) -> bool:
+    lower = name.lower()
+    return lower in TRACKING_PARAMS or lower.startswith(TRACKING_PREFIXES)
+
+def _normalize_host(parts: SplitResult) -> str:
+    """Lower-case host[:port] with any userinfo kept and a default port dropped."""
+    netloc = parts.netloc
+    userinfo, _, _ = netloc.rpartition("@")
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:  # IPv6 literal
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        return netloc.lower()
+    if port is not None and str(port) != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    return f"{userinfo}@{host}" if userinfo else host
+
+def _remove_dot_segments(path: str) -> str:
+    if "." not in path:
+        return path
+    out: list[str] = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(out) > 1:
+                out.pop()
+        elif segment != ".":
+            out.append(segment)
+    if path.endswith(("/.", "/..")):
+        out.append("")
+    return "/".join(out)
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> str:
+    """
+    Canonical, still fetchable form of url (resolved against base if given):
+    lower-case scheme and host, default port dropped, dot segments and path
+    session ids removed, escapes upper-cased, tracking and session query
+    parameters removed, the rest sorted, and the fragment stripped. A
+    trailing slash is kept: /about and /about/ may be different resources
+    (or one redirecting to the other), so the URL is fetched as linked.
+    """
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return url
+
+    netloc = _normalize_host(parts)
+    path = _PATH_SESSION.sub("", parts.path)
+    path = _PERCENT_ESCAPE.sub(lambda m: m.group(0).upper(), path)
+    path = _remove_dot_segments(path) or "/"
+
+    query = ""
+    if parts.query:
+        params = [
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)
+        ]
+        query = urlencode(sorted(params), doseq=True)
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+def site_host(url: str) -> str:
+    """Host used for same-site checks: lower-case, no default port, no 'www.'."""
+    host = _normalize_host(urlsplit(url.strip())).rpartition("@")[2]
+    return host[4:] if host.startswith("www.") else host
+
+def same_site(a: str, b: str) -> bool:
+    return site_host(a) == site_host(b)
+
+def url_key(url: str) -> str:
+    """
+    Dedupe key: the canonical URL with scheme, 'www.' and a trailing slash
+    (except for the root) dropped, so the http/https, www/bare and /about/
+    variants of a page count as one page.
+    """
+    canonical = canonicalize_url(url)
+    parts = urlsplit(canonical)
+    if parts.scheme not in ("http", "https"):
+        return canonical
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    path = parts.path.rstrip("/") or "/"
+    return host + path + ("?" + parts.query if parts.query else "")
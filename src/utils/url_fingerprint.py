@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+from array import array
+from collections import deque
+from typing import Deque, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from utils.bloom_filter import BloomFilter
+
+# Visited-set implementations selectable via the 'visited_set' setting.
+VISITED_SET_KINDS = ("fingerprint", "bloom", "exact")
+
+def url_fingerprint(url: str) -> int:
+    """Non-zero 64-bit fingerprint of a URL (zero marks empty slots)."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+class FingerprintSet:
+    """
+    Set of URLs stored as 64-bit fingerprints in one flat array.
+
+    Open addressing with linear probing keeps each entry at 8 bytes (16 at
+    the worst load factor) instead of the ~100+ bytes a str in a set costs.
+    Two distinct URLs collide with probability ~n^2 / 2^65, negligible for
+    per-site crawls.
+    """
+
+    __slots__ = ("_slots", "_mask", "_count")
+
+    def __init__(self, capacity: int = 64) -> None:
+        size = 16
+        while size < capacity * 2:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def _find(self, fp: int) -> int:
+        slots, mask = self._slots, self._mask
+        i = fp & mask
+        while slots[i] and slots[i] != fp:
+            i = (i + 1) & mask
+        return i
+
+    def __contains__(self, url: str) -> bool:
+        fp = url_fingerprint(url)
+        return self._slots[self._find(fp)] == fp
+
+    def add(self, url: str) -> bool:
+        """Add url; return False if it was already present."""
+        fp = url_fingerprint(url)
+        i = self._find(fp)
+        if self._slots[i] == fp:
+            return False
+        self._slots[i] = fp
+        self._count += 1
+        if self._count * 2 > len(self._slots):
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for fp in old:
+            if fp:
+                self._slots[self._find(fp)] = fp
+
+    def __len__(self) -> int:
+        return self._count
+
+class ExactUrlSet(set):
+    """Plain set with the same add() -> bool contract as the compact sets."""
+
+    def add(self, url: str) -> bool:  # type: ignore[override]
+        if url in self:
+            return False
+        super().add(url)
+        return True
+
+VisitedSet = Union[FingerprintSet, BloomFilter, ExactUrlSet]
+
+def make_visited_set(kind: str = "fingerprint", expected: int = 64) -> VisitedSet:
+    """
+    'fingerprint' (exact up to 64-bit hash collisions, default), 'bloom'
+    (smallest; a false positive skips an unseen URL with probability ~1e-4)
+    or 'exact' (full URL strings).
+    """
+    if kind == "fingerprint":
+        return FingerprintSet(expected)
+    if kind == "bloom":
+        return BloomFilter(capacity=max(64, expected), error_rate=1e-4)
+    if kind == "exact":
+        return ExactUrlSet()
+    raise ValueError(f"Unknown visited_set {kind!r}; expected one of {VISITED_SET_KINDS}")
+
+class UrlFrontier:
+    """
+    FIFO crawl frontier for one site, stored compactly.
+
+    Each entry is a single bytes object: one depth byte followed by the URL
+    with the site's origin stripped when it shares it. That is roughly half
+    the memory of a (str, int) tuple per queued link.
+    """
+
+    __slots__ = ("origin", "_queue")
+
+    def __init__(self, root_url: str) -> None:
+        parts = urlsplit(root_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self._queue: Deque[bytes] = deque()
+
+    def pack(self, url: str, depth: int) -> bytes:
+        if url.startswith(self.origin) and url[len(self.origin):].startswith("/"):
+            url = url[len(self.origin):]
+        return bytes((min(depth, 255),)) + url.encode("utf-8")
+
+    def unpack(self, entry: bytes) -> Tuple[str, int]:
+        url = entry[1:].decode("utf-8")
+        if url.startswith("/"):
+            url = self.origin + url
+        return url, entry[0]
+
+    def push(self, url: str, depth: int) -> None:
+        self._queue.append(self.pack(url, depth))
+
+    def pop(self) -> Tuple[str, int]:
+        return self.unpack(self._queue.popleft())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
+def visited_set_size_hint(max_pages: Optional[int]) -> int:
+    """Links seen per site are typically an order of magnitude above pages fetched."""
+    return max(64, (max_pages or 0) * 16)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.url_canonicalizer import site_host, url_key
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+@dataclass(frozen=True)
+class SiteLease:
+    item_id: int
+    url: str
+    attempts: int
+
+class WorkQueue(ABC):
+    """
+    Shared queue of root URLs for coordinator/worker crawls.
+
+    Sites are keyed by url_key(), so a seed is queued once however often
+    it is enqueued, and partitioned by host: a worker leases a site only
+    while no other worker holds a lease on the same host. Leases expire
+    unless renewed with heartbeat(); expired sites go back to pending (or
+    to failed after max_attempts). Backends implement every abstract
+    method; close() is optional.
+    """
+
+    @abstractmethod
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """Add urls; return how many were new."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, limit: int, lease_seconds: float) -> List[SiteLease]:
+        """Lease up to limit pending sites, on hosts no other worker holds."""
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, item_ids: Iterable[int], lease_seconds: float) -> int:
+        """Extend this worker's leases; return how many it still holds."""
+
+    @abstractmethod
+    def complete(self, worker_id: str, item_id: int, reason: str = "") -> bool:
+        """
+        Mark a leased site done; False if the lease was lost meanwhile.
+        reason records why a site finished without being crawled (e.g. a
+        dead domain), so it is not retried.
+        """
+
+    @abstractmethod
+    def release(self, worker_id: str, item_id: int, error: str = "") -> None:
+        """Give a leased site back after a failed attempt."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of sites in each state."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    WorkQueue in one SQLite file (WAL mode), shared by every process on a
+    host or on a file system with working locks. Each call is one short
+    IMMEDIATE transaction, so concurrent workers never lease the same site.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sites (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                host TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS sites_state_host ON sites (state, host);
+            """
+        )
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], object]) -> object:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, urls: Iterable[str], batch_size: int = 1000) -> int:
+        added = 0
+        batch: List[tuple] = []
+
+        def flush(conn: sqlite3.Connection) -> int:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO sites (key, url, host) VALUES (?, ?, ?)", batch
+            )
+            return conn.total_changes - before
+
+        for url in urls:
+            batch.append((url_key(url), url, site_host(url)))
+            if len(batch) >= batch_size:
+                added += self._transaction(flush)  # type: ignore[operator]
+                batch = []
+        if batch:
+            added += self._transaction(flush)  # type: ignore[operator]
+        return added
+
+    def _expire_locked(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "UPDATE sites SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, error = 'lease expired' "
+            "WHERE state = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now),
+        )
+
+    def lease(self, worker_id: str, limit: int, lease_seconds: float) -> List[SiteLease]:
+        def take(conn: sqlite3.Connection) -> List[SiteLease]:
+            now = time.time()
+            self._expire_locked(conn, now)
+            rows = conn.execute(
+                "SELECT MIN(id), url, attempts FROM sites "
+                "WHERE state = 'pending' "
+                "AND host NOT IN (SELECT host FROM sites WHERE state = 'leased') "
+                "GROUP BY host ORDER BY MIN(id) LIMIT ?",
+                (limit,),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE sites SET state = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                [(worker_id, now + lease_seconds, row[0]) for row in rows],
+            )
+            return [SiteLease(row[0], row[1], row[2] + 1) for row in rows]
+
+        return self._transaction(take)  # type: ignore[return-value]
+
+    def heartbeat(self, worker_id: str, item_ids: Iterable[int], lease_seconds: float) -> int:
+        ids = list(item_ids)
+
+        def renew(conn: sqlite3.Connection) -> int:
+            expires = time.time() + lease_seconds
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE sites SET lease_expires = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                [(expires, item_id, worker_id) for item_id in ids],
+            )
+            return conn.total_changes - before
+
+        return self._transaction(renew) if ids else 0  # type: ignore[return-value]
+
+    def complete(self, worker_id: str, item_id: int, reason: str = "") -> bool:
+        def finish(conn: sqlite3.Connection) -> bool:
+            cur = conn.execute(
+                "UPDATE sites SET state = 'done', lease_expires = NULL, error = NULLIF(?, '') "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (reason, item_id, worker_id),
+            )
+            return cur.rowcount > 0
+
+        return self._transaction(finish)  # type: ignore[return-value]
+
+    def release(self, worker_id: str, item_id: int, error: str = "") -> None:
+        self._transaction(
+            lambda conn: conn.execute(
+                "UPDATE sites SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, lease_expires = NULL, error = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (self.max_attempts, error, item_id, worker_id),
+            )
+        )
+
+    def counts(self) -> Dict[str, int]:
+        def count(conn: sqlite3.Connection) -> Dict[str, int]:
+            self._expire_locked(conn, time.time())
+            rows = conn.execute("SELECT state, COUNT(*) FROM sites GROUP BY state").fetchall()
+            return {state: 0 for state in (PENDING, LEASED, DONE, FAILED)} | dict(rows)
+
+        return self._transaction(count)  # type: ignore[return-value]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+# Backends by URI scheme; a bare path means sqlite.
+QUEUE_BACKENDS: Dict[str, Callable[..., WorkQueue]] = {"sqlite": SqliteWorkQueue}
+
+def register_queue_backend(scheme: str, factory: Callable[..., WorkQueue]) -> None:
+    QUEUE_BACKENDS[scheme] = factory
+
+def open_work_queue(uri: str, **kwargs: object) -> WorkQueue:
+    """
+    Open a queue from a plain file path (SQLite), 'sqlite:///relative.db',
+    'sqlite:////absolute.db' or '<scheme>://...' for a registered backend.
+    """
+    scheme, sep, rest = uri.partition("://")
+    if not sep:
+        return SqliteWorkQueue(uri, **kwargs)  # type: ignore[arg-type]
+    factory = QUEUE_BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"Unknown work queue backend {scheme!r}; expected one of {sorted(QUEUE_BACKENDS)}")
+    if scheme == "sqlite":
+        rest = rest[1:] if rest.startswith("/") else rest
+    return factory(rest, **kwargs)
+
+class LeaseKeeper:
+    """Background thread renewing a worker's current leases every interval seconds."""
+
+    def __init__(self, queue: WorkQueue, worker_id: str, lease_seconds: float) -> None:
+        self.queue = queue
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._ids: List[int] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def hold(self, item_ids: Iterable[int]) -> None:
+        self._ids = list(item_ids)
+
+    def _run(self) -> None:
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                held = self.queue.heartbeat(self.worker_id, self._ids, self.lease_seconds)
+            except sqlite3.Error as exc:
+                logger.warning("Lease heartbeat failed: %s", exc)
+                continue
+            if held < len(self._ids):
+                logger.warning("Worker %s lost %d lease(s)", self.worker_id, len(self._ids) - held)
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,147 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from utils import dns_cache
+from utils.dns_cache import NXDOMAIN, TEMPORARY_FAILURE, TIMEOUT, DnsCache, DnsError, filter_resolvable
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class StubResolver:
+    """Answers from a table: host -> (addresses, ttl) or a DnsError reason."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, host):
+        self.calls.append(host)
+        answer = self.answers[host]
+        if isinstance(answer, str):
+            raise DnsError(answer)
+        return answer
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dns_cache.time, "monotonic", clock)
+    return clock
+
+def test_answer_is_cached_for_its_record_ttl(clock):
+    resolver = StubResolver({"example.com": (["192.0.2.1"], 120)})
+    cache = DnsCache(resolver, ttl=300, min_ttl=30)
+
+    assert cache.resolve("example.com").addresses == ["192.0.2.1"]
+    clock.now += 119
+    assert cache.resolve("Example.COM.").ok
+    assert resolver.calls == ["example.com"]
+
+    clock.now += 2
+    assert cache.cached("example.com") is None
+    resolver.answers["example.com"] = (["192.0.2.2"], 120)
+    assert cache.resolve("example.com").addresses == ["192.0.2.2"]
+    assert resolver.calls == ["example.com", "example.com"]
+
+def test_record_ttl_is_clamped(clock):
+    resolver = StubResolver({"short.test": (["192.0.2.1"], 1), "long.test": (["192.0.2.2"], 86400)})
+    cache = DnsCache(resolver, ttl=300, min_ttl=30)
+
+    assert cache.resolve("short.test").expires == clock.now + 30
+    assert cache.resolve("long.test").expires == clock.now + 300
+
+def test_missing_ttl_uses_default(clock):
+    resolver = StubResolver({"example.com": (["192.0.2.1"], None)})
+    cache = DnsCache(resolver, ttl=300)
+
+    assert cache.resolve("example.com").expires == clock.now + 300
+
+def test_failures_are_cached_for_negative_ttl(clock):
+    resolver = StubResolver({"gone.test": NXDOMAIN})
+    cache = DnsCache(resolver, negative_ttl=60)
+
+    result = cache.resolve("gone.test")
+    assert not result.ok and result.reason == NXDOMAIN
+    clock.now += 59
+    assert cache.resolve("gone.test").reason == NXDOMAIN
+    assert resolver.calls == ["gone.test"]
+
+    clock.now += 2
+    resolver.answers["gone.test"] = (["192.0.2.9"], 300)
+    assert cache.resolve("gone.test").ok
+    assert resolver.calls == ["gone.test", "gone.test"]
+
+def test_getaddrinfo_answers_from_cache(clock):
+    resolver = StubResolver({"example.com": (["127.0.0.1"], 300), "gone.test": NXDOMAIN})
+    cache = DnsCache(resolver)
+
+    infos = cache.getaddrinfo("example.com", 80, type=socket.SOCK_STREAM)
+    assert {info[4][0] for info in infos} == {"127.0.0.1"}
+    cache.getaddrinfo("example.com", 443, type=socket.SOCK_STREAM)
+    assert resolver.calls == ["example.com"]
+
+    with pytest.raises(socket.gaierror):
+        cache.getaddrinfo("gone.test", 80)
+    with pytest.raises(socket.gaierror):
+        cache.getaddrinfo("gone.test", 80)
+    assert resolver.calls == ["example.com", "gone.test"]
+
+def test_filter_resolvable_drops_only_dead_hosts(clock):
+    resolver = StubResolver(
+        {
+            "alive.test": (["192.0.2.1"], 300),
+            "gone.test": NXDOMAIN,
+            "flaky.test": TEMPORARY_FAILURE,
+        }
+    )
+    cache = DnsCache(resolver)
+    dead = []
+    urls = ["https://alive.test/", "https://gone.test/", "https://flaky.test/", "https://alive.test/about"]
+
+    kept = filter_resolvable(urls, cache, lambda url, reason: dead.append((url, reason)))
+    assert kept == ["https://alive.test/", "https://flaky.test/", "https://alive.test/about"]
+    assert dead == [("https://gone.test/", NXDOMAIN)]
+
+    lazy = filter_resolvable(iter(urls), cache, lambda url, reason: None, window=2)
+    assert list(lazy) == kept
+    # Only the transient failure is looked up again
+    assert sorted(resolver.calls) == ["alive.test", "flaky.test", "flaky.test", "gone.test"]
+
+def test_timeouts_are_crawled_and_not_cached(clock):
+    resolver = StubResolver({"slow.test": TIMEOUT})
+    cache = DnsCache(resolver, negative_ttl=60)
+    dead = []
+
+    kept = filter_resolvable(["https://slow.test/"], cache, lambda url, reason: dead.append(url))
+    assert kept == ["https://slow.test/"] and dead == []
+    resolver.answers["slow.test"] = (["192.0.2.1"], 300)
+    assert cache.resolve("slow.test").ok
+
+def test_prefetch_past_its_budget_keeps_the_seeds():
+    release = threading.Event()
+    started = []
+
+    def hanging(host):
+        started.append(host)
+        release.wait(5)
+        return ["192.0.2.1"], 300
+
+    cache = DnsCache(hanging)
+    dead = []
+    urls = [f"https://host{i}.test/" for i in range(4)]
+    try:
+        kept = filter_resolvable(
+            urls, cache, lambda url, reason: dead.append(url), concurrency=2, timeout=0.1
+        )
+        assert kept == urls and dead == []
+    finally:
+        release.set()
+    time.sleep(0.1)
+    # Lookups still queued when the budget ran out were cancelled
+    assert len(started) == 2
@@ -0,0 +1,138 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils.proxy_pool import NoProxyAvailable, ProxyPool
+
+class StubProxy:
+    """
+    Local forward proxy that answers every request itself with status,
+    optionally holding each one until release is set.
+    """
+
+    def __init__(self, status: int = 200) -> None:
+        self.status = status
+        self.release = threading.Event()
+        self.release.set()
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                try:
+                    stub.release.wait(5)
+                    body = b"ok"
+                    self.send_response(stub.status)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with lock:
+                        stub.active -= 1
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub_proxies():
+    started = []
+
+    def start(status: int = 200) -> StubProxy:
+        proxy = StubProxy(status)
+        started.append(proxy)
+        return proxy
+
+    yield start
+    for proxy in started:
+        proxy.close()
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+def fetch(pool: ProxyPool, session: requests.Session) -> str:
+    """
+    One request the way the crawlers make it: an error leaving the lease
+    counts against the proxy. Returns the proxy used.
+    """
+    lease = pool.acquire(timeout=2)
+    try:
+        with lease:
+            resp = session.get("http://example.test/", proxies=lease.proxies, timeout=2)
+            lease.observe(resp.status_code)
+    except requests.ConnectionError:
+        pass
+    return lease.proxy
+
+def stats(pool: ProxyPool, url: str):
+    return next(s for s in pool._stats if s.url == url)
+
+def test_bans_quarantine_a_proxy_only_past_min_requests(stub_proxies):
+    good, banned = stub_proxies(200), stub_proxies(403)
+    pool = ProxyPool([good.url, banned.url], alpha=0.5, min_requests=3, quarantine_seconds=0.3)
+    session = requests.Session()
+
+    while fetch(pool, session) != banned.url:
+        pass
+    # One ban may be a single protected page, not a blocked exit IP
+    assert stats(pool, banned.url).quarantined_until == 0.0
+    for _ in range(500):
+        if stats(pool, banned.url).quarantined_until:
+            break
+        fetch(pool, session)
+    assert stats(pool, banned.url).strikes == 1
+    requests_before = banned.requests
+    assert all(fetch(pool, session) == good.url for _ in range(20))
+    assert banned.requests == requests_before
+
+    time.sleep(0.35)
+    banned.status = 200
+    # Re-admitted on probation, at a lower weight than the healthy proxy
+    assert any(fetch(pool, session) == banned.url for _ in range(500))
+    assert banned.requests == requests_before + 1
+    assert stats(pool, banned.url).quarantined_until == 0.0
+    assert stats(pool, banned.url).error_rate < pool.error_threshold / 2
+
+def test_repeat_quarantines_get_longer(stub_proxies):
+    banned = stub_proxies(429)
+    pool = ProxyPool([banned.url], alpha=1.0, min_requests=1, quarantine_seconds=0.2)
+    session = requests.Session()
+
+    fetch(pool, session)
+    with pytest.raises(NoProxyAvailable):
+        pool.acquire(timeout=0.1)
+    time.sleep(0.25)
+    started = time.monotonic()
+    fetch(pool, session)  # second strike: 0.4s
+    fetch(pool, session)
+    assert time.monotonic() - started >= 0.35
+    assert stats(pool, banned.url).strikes == 3
+
+def test_page_banned_through_several_proxies():
+    pool = ProxyPool(["http://a:1", "http://b:1", "http://c:1"], page_ban_proxies=2)
+    assert not pool.page_banned({"http://a:1"})
+    assert pool.page_banned({"http://a:1", "http://b:1"})
+    # With a single proxy there is nothing else to try
+    assert ProxyPool(["http://a:1"]).page_banned({"http://a:1"})